@@ -0,0 +1,108 @@
+"""
+Startup benchmark for the backend.
+
+Measures import time of the server and runner modules (broken down by
+top-level package, via `python -X importtime`) and the time from process
+start until /health answers and until it reports the runner as ready.
+
+Usage:
+    python bench_startup.py [--port 8765] [--top 15]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(module: str) -> tuple[int, dict[str, int]]:
+    """Return the cumulative import time of a module and of the packages it imports.
+    
+    Times are in microseconds; the breakdown covers the module's direct
+    imports grouped by top-level package.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "ANTHROPIC_API_KEY": os.getenv("ANTHROPIC_API_KEY", "benchmark")}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total = 0
+    breakdown = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Each nesting level is indented by two more spaces
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 0 and name == module:
+            total = int(cumulative)
+        elif depth == 1:
+            breakdown[name.split(".")[0]] += int(cumulative)
+    return total, dict(breakdown)
+
+
+def print_import_times(module: str, top: int):
+    total, breakdown = import_times(module)
+    print(f"\nimport {module}: {total / 1000:.1f} ms")
+    for name, micros in sorted(breakdown.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {name:<30} {micros / 1000:8.1f} ms")
+
+
+def wait_for(process: subprocess.Popen, url: str, predicate, timeout: float = 60):
+    """Poll url until predicate(json body) is true."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if predicate(json.loads(response.read())):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} did not become available within {timeout}s")
+
+
+def time_to_first_request(port: int):
+    """Start the server and time /health becoming available and ready."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "ANTHROPIC_API_KEY": os.getenv("ANTHROPIC_API_KEY", "benchmark")}
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/health"
+        wait_for(process, url, lambda body: True)
+        first_request = time.perf_counter() - start
+        wait_for(process, url, lambda body: body.get("ready"))
+        ready = time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(f"\ntime to first /health response: {first_request * 1000:.0f} ms")
+    print(f"time to runner ready:           {ready * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--top", type=int, default=15, help="Packages to show per module")
+    args = parser.parse_args()
+
+    for module in ("server", "runner"):
+        print_import_times(module, args.top)
+    time_to_first_request(args.port)
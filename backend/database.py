@@ -1,7 +1,7 @@
 import os
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import create_engine, Column, String, Integer, Text, DateTime, JSON
+from sqlalchemy import create_engine, inspect, Column, String, Integer, Text, DateTime, JSON
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base, Session
 
@@ -12,7 +12,7 @@ class Run(Base):
     
     run_id = Column(String, primary_key=True)
     problem = Column(Text, nullable=False)
-    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed, cancelled
     current_step_index = Column(Integer, nullable=False, default=0)
     total_steps = Column(Integer, nullable=False, default=0)
     started_at = Column(DateTime, nullable=True)
@@ -20,6 +20,14 @@ class Run(Base):
     final_output = Column(Text, nullable=True)
     error = Column(Text, nullable=True)
     state_data = Column(JSON, nullable=True)  # Store LangGraph state
+    batch_id = Column(String, nullable=True, index=True)  # Set for runs submitted via /api/runs/batch
+
+class Batch(Base):
+    __tablename__ = "batches"
+    
+    batch_id = Column(String, primary_key=True)
+    total_runs = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
 class Event(Base):
     __tablename__ = "events"
@@ -30,6 +38,13 @@ class Event(Base):
     type = Column(String, nullable=False)  # plan_created, step_started, etc.
     data = Column(JSON, nullable=False)
 
+class RunSnapshot(Base):
+    __tablename__ = "run_snapshots"
+    
+    run_id = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # Id of the last event applied
+    data = Column(JSON, nullable=False)  # Materialized view of the run's events
+
 # Database setup
 DATABASE_PATH = os.getenv("DATABASE_PATH", "data/runs.db")
 os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
@@ -39,10 +54,30 @@ DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
 engine = create_async_engine(DATABASE_URL, echo=False)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+def _add_missing_columns(conn):
+    """Add columns and indexes introduced after a table was first created.
+    
+    create_all() never alters existing tables, so databases created by an
+    older version would otherwise miss new (nullable) columns.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
 async def init_db():
     """Initialize the database tables."""
+    async with engine.connect() as conn:
+        # WAL lets readers (e.g. exports) hold a snapshot without blocking writers
+        await conn.exec_driver_sql("PRAGMA journal_mode=WAL")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
 
 async def get_session() -> AsyncSession:
     """Get a database session."""
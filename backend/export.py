@@ -0,0 +1,275 @@
+"""
+Streaming bulk export of runs and events.
+
+Reads through a read-only SQLite connection inside a single read
+transaction, so the export sees one consistent snapshot while the server
+keeps writing (the database runs in WAL mode). Rows are read in chunks of
+EXPORT_CHUNK_SIZE ordered by a cursor (rowid for runs, id for events) and
+written to part files of up to EXPORT_PART_ROWS rows. The cursor of the
+last completed part file is saved so an interrupted export can resume.
+
+Usage:
+    python export.py --out exports/ [--format ndjson|parquet|csv]
+                     [--status completed --status failed]
+                     [--since 2024-01-01] [--until 2024-02-01] [--resume]
+
+Parquet needs pyarrow; without it the export falls back to gzipped CSV.
+"""
+import io
+import os
+import csv
+import gzip
+import json
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+from typing import Iterator, Optional
+
+from database import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_PART_ROWS = 100_000  # Rows per part file; the resume cursor advances per part
+
+# Columns per table; "cursor" is the resume position of each row
+EXPORT_COLUMNS = {
+    "runs": [
+        "cursor", "run_id", "batch_id", "status", "current_step_index", "total_steps",
+        "started_at", "updated_at", "problem", "final_output", "error", "state_data",
+    ],
+    "events": ["cursor", "run_id", "ts", "type", "data"],
+}
+INTEGER_COLUMNS = {"cursor", "current_step_index", "total_steps"}
+JSON_COLUMNS = {"state_data", "data"}
+
+
+def connect_readonly(path: str = DATABASE_PATH) -> sqlite3.Connection:
+    """Open a read-only connection pinned to one snapshot of the database."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # Every chunk is read in this transaction, so all of them see the same data
+    conn.execute("BEGIN")
+    return conn
+
+
+def iter_chunks(
+    conn: sqlite3.Connection,
+    table: str,
+    cursor: int = 0,
+    statuses: Optional[list[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[list[dict]]:
+    """Yield rows of a table after cursor in chunks, filtered by run status and time range.
+
+    Runs are filtered on updated_at and events on ts. Events are filtered
+    on the status of their run.
+    """
+    if table == "runs":
+        query = (
+            "SELECT rowid AS cursor, run_id, batch_id, status, current_step_index, total_steps, "
+            "started_at, updated_at, problem, final_output, error, state_data FROM runs WHERE rowid > ?"
+        )
+        cursor_column, time_column = "rowid", "updated_at"
+    elif table == "events":
+        query = "SELECT id AS cursor, run_id, ts, type, data FROM events WHERE id > ?"
+        cursor_column, time_column = "id", "ts"
+    else:
+        raise ValueError(f"Unknown table: {table}")
+
+    filters, params = [], []
+    if statuses:
+        placeholders = ", ".join("?" * len(statuses))
+        if table == "runs":
+            filters.append(f"status IN ({placeholders})")
+        else:
+            filters.append(f"run_id IN (SELECT run_id FROM runs WHERE status IN ({placeholders}))")
+        params += statuses
+    # SQLAlchemy stores datetimes as "YYYY-MM-DD HH:MM:SS.ffffff" text
+    if since:
+        filters.append(f"{time_column} >= ?")
+        params.append(since.isoformat(sep=" "))
+    if until:
+        filters.append(f"{time_column} < ?")
+        params.append(until.isoformat(sep=" "))
+    for condition in filters:
+        query += f" AND {condition}"
+    query += f" ORDER BY {cursor_column} LIMIT ?"
+
+    while True:
+        rows = conn.execute(query, [cursor, *params, chunk_size]).fetchall()
+        if not rows:
+            return
+        yield [dict(row) for row in rows]
+        cursor = rows[-1]["cursor"]
+
+
+def decode_json(value):
+    """Decode a JSON column (state_data is stored JSON-encoded twice)."""
+    while isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            break
+    return value
+
+
+def to_ndjson(row: dict) -> str:
+    """Format a row as an NDJSON line, with JSON columns decoded."""
+    return json.dumps({
+        key: decode_json(value) if key in JSON_COLUMNS else value
+        for key, value in row.items()
+    }) + "\n"
+
+
+def to_csv(rows: list[dict], table: str, header: bool = False) -> str:
+    """Format rows as CSV text, optionally preceded by the header line."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS[table])
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+class NDJSONWriter:
+    extension = "ndjson"
+
+    def __init__(self, path: str, table: str):
+        self.file = open(path, "w")
+
+    def write(self, rows: list[dict]):
+        self.file.writelines(to_ndjson(row) for row in rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class CSVWriter:
+    extension = "csv.gz"
+
+    def __init__(self, path: str, table: str):
+        self.file = gzip.open(path, "wt", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=EXPORT_COLUMNS[table])
+        self.writer.writeheader()
+
+    def write(self, rows: list[dict]):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    extension = "parquet"
+
+    def __init__(self, path: str, table: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([
+            (name, pa.int64() if name in INTEGER_COLUMNS else pa.string())
+            for name in EXPORT_COLUMNS[table]
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, rows: list[dict]):
+        self.writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def get_writer_class(output_format: str):
+    """Writer for a format; parquet falls back to gzipped CSV without pyarrow."""
+    if output_format == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+            return ParquetWriter
+        except ImportError:
+            logger.warning("pyarrow is not installed, exporting gzipped CSV instead of Parquet")
+            return CSVWriter
+    return {"ndjson": NDJSONWriter, "csv": CSVWriter}[output_format]
+
+
+def export_to_directory(
+    out_dir: str,
+    output_format: str = "ndjson",
+    statuses: Optional[list[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    resume: bool = False,
+    database_path: str = DATABASE_PATH
+) -> dict[str, int]:
+    """Export runs and events to files in out_dir and return the final cursors.
+
+    Each invocation writes new part files named after their starting cursor.
+    A part file (Parquet footer, gzip trailer) is only readable once closed,
+    so cursor.json is updated after each part is closed and --resume
+    rewrites a part that was interrupted.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    cursor_path = os.path.join(out_dir, "cursor.json")
+    cursors = {"runs": 0, "events": 0}
+    if resume and os.path.exists(cursor_path):
+        with open(cursor_path) as f:
+            cursors.update(json.load(f))
+
+    writer_class = get_writer_class(output_format)
+    conn = connect_readonly(database_path)
+
+    def close_part(table: str, writer, path: str, cursor: int):
+        writer.close()
+        cursors[table] = cursor
+        with open(cursor_path, "w") as f:
+            json.dump(cursors, f)
+        logger.info(f"Exported {table} up to cursor {cursor} to {path}")
+
+    try:
+        for table in ("runs", "events"):
+            writer, part_rows, cursor = None, 0, cursors[table]
+            for rows in iter_chunks(conn, table, cursors[table], statuses, since, until):
+                if writer is None:
+                    path = os.path.join(out_dir, f"{table}-{cursor:012d}.{writer_class.extension}")
+                    writer, part_rows = writer_class(path, table), 0
+                writer.write(rows)
+                part_rows += len(rows)
+                cursor = rows[-1]["cursor"]
+                if part_rows >= EXPORT_PART_ROWS:
+                    close_part(table, writer, path, cursor)
+                    writer = None
+            if writer:
+                close_part(table, writer, path, cursor)
+    finally:
+        conn.close()
+
+    return cursors
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--format", choices=["ndjson", "parquet", "csv"], default="ndjson")
+    parser.add_argument("--status", action="append", help="Only runs with this status (repeatable)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Start of the time range (inclusive)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="End of the time range (exclusive)")
+    parser.add_argument("--resume", action="store_true", help="Continue from cursor.json in the output directory")
+    parser.add_argument("--database", default=DATABASE_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    export_to_directory(
+        args.out,
+        output_format=args.format,
+        statuses=args.status,
+        since=args.since,
+        until=args.until,
+        resume=args.resume,
+        database_path=args.database
+    )
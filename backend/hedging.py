@@ -0,0 +1,123 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from loop_monitor import loop_monitor
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: fire a duplicate model request when a call is slower than usual for its node
+LLM_HEDGING = os.getenv("LLM_HEDGING", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))  # Hedge after this latency percentile
+HEDGE_MAX_RATE = float(os.getenv("HEDGE_MAX_RATE", "0.1"))  # At most this fraction of calls is hedged
+HEDGE_MIN_SAMPLES = 20  # Latencies needed for a node before it is hedged
+LATENCY_WINDOW = 200  # Recent latencies kept per node
+HEDGE_BUDGET_WINDOW = 100  # The hedge rate is capped over this many recent calls
+
+
+class HedgePolicy:
+    """Hedges slow model calls: the first response wins, the other is cancelled.
+
+    Latencies are tracked per graph node. Once a call has been running longer
+    than the configured percentile of recent latencies for its node, a
+    duplicate request is sent, as long as the share of hedged calls among
+    the last HEDGE_BUDGET_WINDOW calls stays within the budget. A window
+    rather than a lifetime count keeps a latency spike after a long quiet
+    period from hedging a burst of calls.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = LLM_HEDGING,
+        percentile: float = HEDGE_PERCENTILE,
+        max_rate: float = HEDGE_MAX_RATE,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        budget_window: int = HEDGE_BUDGET_WINDOW
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.latencies: dict[str, deque[float]] = {}
+        # Sequence numbers of the recent calls, and of those that were hedged
+        self._recent_calls: deque[int] = deque(maxlen=budget_window)
+        self._recent_hedges: deque[int] = deque()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self, node: str) -> Optional[float]:
+        """Seconds to wait before hedging a call for this node, or None to never hedge."""
+        if not self.enabled:
+            return None
+        latencies = sorted(self.latencies.get(node, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[min(len(latencies) - 1, int(self.percentile * len(latencies)))]
+
+    def within_budget(self) -> bool:
+        """Whether one more hedge keeps the recent hedge rate within max_rate."""
+        while self._recent_hedges and self._recent_hedges[0] < self._recent_calls[0]:
+            self._recent_hedges.popleft()
+        return len(self._recent_hedges) + 1 <= self.max_rate * len(self._recent_calls)
+
+    async def call(self, node: str, make_call: Callable[[], Awaitable]):
+        """Await make_call(), hedging it with a second call if it is slow."""
+        self.calls += 1
+        call_number = self.calls
+        self._recent_calls.append(call_number)
+        start = time.monotonic()
+        primary = loop_monitor.create_task(make_call())
+        tasks = {primary}
+
+        try:
+            delay = self.hedge_delay(node)
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if not primary.done() and self.within_budget():
+                    self.hedges += 1
+                    self._recent_hedges.append(call_number)
+                    tasks.add(loop_monitor.create_task(make_call()))
+                    logger.info(f"Hedging slow {node} call after {delay:.2f}s")
+
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                winner = done.pop()
+                tasks.discard(winner)
+                # A failed call only loses if the other one can still answer
+                if winner.exception() is None or not tasks:
+                    break
+
+            if winner is not primary and winner.exception() is None:
+                self.hedge_wins += 1
+            result = winner.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        self.latencies.setdefault(node, deque(maxlen=LATENCY_WINDOW)).append(time.monotonic() - start)
+        return result
+
+    def stats(self) -> dict:
+        """Hedging counters and per-node latency thresholds."""
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": round(self.hedges / self.calls, 4) if self.calls else 0.0,
+            "hedge_win_rate": round(self.hedge_wins / self.hedges, 4) if self.hedges else 0.0,
+            "nodes": {
+                node: {
+                    "samples": len(latencies),
+                    "hedge_after_s": self.hedge_delay(node)
+                }
+                for node, latencies in self.latencies.items()
+            }
+        }
+
+
+hedge_policy = HedgePolicy()
@@ -0,0 +1,122 @@
+import json
+
+
+class JSONArrayStreamParser:
+    """Incrementally extract the objects of the first JSON array of objects in a text stream.
+
+    Text is scanned once, character by character, so parsing stays linear in
+    the size of the response. Prose around the array is skipped, including
+    bracketed text that is not valid JSON (e.g. "Format: [{...}]"). Each
+    object is returned as soon as its closing brace arrives.
+
+    An array inside a markdown code fence takes precedence over one found
+    earlier in the prose: when a fence opens, the objects seen so far are
+    discarded (and `restarts` is incremented). If the fenced block holds no
+    array of objects, the earlier array is restored when the fence closes.
+    """
+
+    def __init__(self):
+        self.objects: list = []
+        self.done = False  # True once the array's closing bracket was seen
+        self.restarts = 0  # Times the objects seen so far were discarded (code fence or invalid JSON)
+        self._final = False  # True once an array inside a code fence was completed
+        self._in_fence = False
+        self._backticks = 0  # Consecutive backticks seen outside of objects
+        self._unfenced: list | None = None  # Array found before the current code fence
+        self._in_array = False
+        self._depth = 0  # Nesting depth inside the object being scanned
+        self._in_string = False
+        self._escape = False
+        self._current: list[str] = []  # Characters of the object being scanned
+
+    def _reset_array(self):
+        self.objects = []
+        self.done = False
+        self._in_array = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._current = []
+
+    def _drop_array(self, completed: list):
+        """Discard the array being scanned, including objects already returned."""
+        if self.objects:
+            self.restarts += 1
+            completed.clear()
+        self._reset_array()
+
+    def _toggle_fence(self, completed: list):
+        self._in_fence = not self._in_fence
+        if self._in_fence:
+            if self.done:
+                self._unfenced = self.objects
+            self._drop_array(completed)
+        elif not self.done:
+            # No array of objects in the block: fall back to the one before it
+            self._drop_array(completed)
+            if self._unfenced:
+                self.objects, self.done = self._unfenced, True
+
+    def feed(self, chunk: str) -> list:
+        """Consume a chunk of text and return the objects it completed."""
+        completed = []
+
+        for ch in chunk:
+            if self._final:
+                break
+
+            if self._depth:
+                self._current.append(ch)
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif ch == "\\":
+                        self._escape = True
+                    elif ch == '"':
+                        self._in_string = False
+                elif ch == '"':
+                    self._in_string = True
+                elif ch in "{[":
+                    self._depth += 1
+                elif ch in "}]":
+                    self._depth -= 1
+                    if not self._depth:
+                        try:
+                            obj = json.loads("".join(self._current))
+                        except json.JSONDecodeError:
+                            # A placeholder like "[{step}]", not the array we want
+                            self._drop_array(completed)
+                            continue
+                        self._current = []
+                        self.objects.append(obj)
+                        completed.append(obj)
+                continue
+
+            if ch == "`":
+                self._backticks += 1
+                if self._backticks == 3:
+                    self._backticks = 0
+                    self._toggle_fence(completed)
+                continue
+            self._backticks = 0
+
+            if self.done:
+                # Only a code fence can still replace the array
+                continue
+            if self._in_array:
+                if ch == "{":
+                    self._depth = 1
+                    self._current = [ch]
+                elif ch == "]":
+                    if self.objects:
+                        self.done = True
+                        self._final = self._in_fence
+                    else:
+                        self._in_array = False
+                elif ch not in ", \t\r\n":
+                    # Not an array of objects (e.g. "[see below]"), keep looking
+                    self._drop_array(completed)
+            elif ch == "[":
+                self._in_array = True
+
+        return completed
@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))  # Seconds between lag samples
+LOOP_LAG_WINDOW = 1000  # Number of recent samples used for percentiles
+# Opt-in: capture stack traces of callbacks blocking the loop for longer than the threshold
+LOOP_BLOCKING_DEBUG = os.getenv("LOOP_BLOCKING_DEBUG", "false").lower() == "true"
+LOOP_BLOCKING_THRESHOLD = float(os.getenv("LOOP_BLOCKING_THRESHOLD", "0.1"))
+MAX_BLOCKING_REPORTS = 50
+# Opt-in: run CPU-heavy parsing/serialization in the default thread pool
+OFFLOAD_CPU_WORK = os.getenv("OFFLOAD_CPU_WORK", "false").lower() == "true"
+
+
+class LoopMonitor:
+    """Samples event-loop lag and, in debug mode, reports blocking callbacks.
+
+    Lag is measured by a task that sleeps for a fixed interval and records
+    how late it wakes up. In debug mode a watchdog thread notices when that
+    task stops waking up and captures the loop thread's stack, attributed to
+    the run and graph node labelled on the task that is executing.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, window: int = LOOP_LAG_WINDOW):
+        self.interval = interval
+        self.lags: deque[float] = deque(maxlen=window)
+        self.blocking_calls: deque[dict] = deque(maxlen=MAX_BLOCKING_REPORTS)
+        self._labels = weakref.WeakKeyDictionary()  # asyncio.Task -> labels
+        self._sampler: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._heartbeat = time.monotonic()
+
+    def start(self, debug: bool = LOOP_BLOCKING_DEBUG, threshold: float = LOOP_BLOCKING_THRESHOLD):
+        """Start sampling on the running loop (and the watchdog if debug)."""
+        loop = asyncio.get_running_loop()
+        self._heartbeat = time.monotonic()
+        self._sampler = asyncio.create_task(self._sample())
+        if debug:
+            self._stop.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch,
+                args=(loop, threading.get_ident(), threshold),
+                name="loop-watchdog",
+                daemon=True
+            )
+            self._watchdog.start()
+
+    def stop(self):
+        """Stop the sampler and the watchdog."""
+        if self._sampler:
+            self._sampler.cancel()
+            self._sampler = None
+        if self._watchdog:
+            self._stop.set()
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - start - self.interval))
+            self._heartbeat = time.monotonic()
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, loop_thread_id: int, threshold: float):
+        reported_heartbeat = None
+        while not self._stop.wait(threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < threshold or heartbeat == reported_heartbeat:
+                continue
+
+            # Report each stall once, while the blocking callback is still running
+            reported_heartbeat = heartbeat
+            frame = sys._current_frames().get(loop_thread_id)
+            task = asyncio.current_task(loop)
+            report = {
+                "ts": datetime.utcnow().isoformat(),
+                "blocked_ms": round(blocked * 1000, 1),
+                **(self._labels.get(task, {}) if task else {}),
+                "stack": "".join(traceback.format_stack(frame)) if frame else None
+            }
+            self.blocking_calls.append(report)
+            logger.warning(
+                f"Event loop blocked for {report['blocked_ms']}ms "
+                f"(run_id={report.get('run_id')}, node={report.get('node')})\n{report['stack']}"
+            )
+
+    def label_task(self, **labels):
+        """Attach labels (e.g. run_id, node) to the current task for blocking reports."""
+        task = asyncio.current_task()
+        if task:
+            self._labels[task] = labels
+
+    def create_task(self, coro) -> asyncio.Task:
+        """Create a task that inherits the current task's labels."""
+        task = asyncio.create_task(coro)
+        current = asyncio.current_task()
+        labels = self._labels.get(current) if current else None
+        if labels:
+            self._labels[task] = labels
+        return task
+
+    def stats(self) -> dict:
+        """Lag percentiles over the recent samples, in milliseconds."""
+        lags = sorted(self.lags)
+        if not lags:
+            return {"samples": 0}
+
+        def percentile(p: float) -> float:
+            return round(lags[min(len(lags) - 1, int(p * len(lags)))] * 1000, 2)
+
+        return {
+            "samples": len(lags),
+            "p50_ms": percentile(0.50),
+            "p90_ms": percentile(0.90),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(lags[-1] * 1000, 2)
+        }
+
+
+async def run_cpu_bound(func: Callable, *args):
+    """Call func, in the default thread pool if OFFLOAD_CPU_WORK is enabled."""
+    if OFFLOAD_CPU_WORK:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+loop_monitor = LoopMonitor()
@@ -2,15 +2,61 @@ from datetime import datetime
 from typing import Optional, Literal, Any
 from pydantic import BaseModel, Field
 
-class CreateRunRequest(BaseModel):
+VerificationPolicy = Literal["per_step", "batched", "sampled", "off"]
+
+class RunOptions(BaseModel):
+    """Per-run execution options shared by single and batch submissions."""
+    verification_policy: VerificationPolicy = Field(
+        "per_step",
+        description="per_step: verify after every step; batched: verify all steps in one call "
+                    "before the final output; sampled: verify a risk-weighted random subset; "
+                    "off: skip verification"
+    )
+    verification_sample_rate: float = Field(
+        0.5,
+        gt=0,
+        le=1,
+        description="Fraction of steps verified under the sampled policy"
+    )
+    deadline_seconds: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Cancel the run if it is still executing after this many seconds"
+    )
+
+class CreateRunRequest(RunOptions):
     problem: str = Field(..., description="The problem to solve")
 
 class CreateRunResponse(BaseModel):
     run_id: str
 
+MAX_BATCH_SIZE = 5000  # Upper bound on problems accepted by a single batch request
+
+class CreateBatchRequest(RunOptions):
+    problems: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description="The problems to solve, one run per problem"
+    )
+
+class CreateBatchResponse(BaseModel):
+    batch_id: str
+    run_ids: list[str]  # Same order as the submitted problems
+
+class BatchStatus(BaseModel):
+    batch_id: str
+    total_runs: int
+    queued: int
+    running: int
+    completed: int
+    failed: int
+    cancelled: int
+    created_at: datetime
+
 class RunStatus(BaseModel):
     run_id: str
-    status: Literal["queued", "running", "completed", "failed"]
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
     current_step_index: int
     total_steps: int
     started_at: Optional[datetime] = None
@@ -22,3 +68,21 @@ class Event(BaseModel):
     ts: datetime
     type: str
     data: dict[str, Any]
+
+class SnapshotStep(BaseModel):
+    step_number: int
+    description: str
+    verification_checklist: list[str]
+    status: Literal["pending", "running", "completed"]
+    output: Optional[str] = None
+    verified: Optional[bool] = None
+    verify_reason: Optional[str] = None
+
+class RunSnapshot(BaseModel):
+    run_id: str
+    version: int  # Id of the last event included; resume SSE with ?after=version
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    total_steps: int
+    steps: list[SnapshotStep]
+    final_output: Optional[str] = None
+    error: Optional[str] = None
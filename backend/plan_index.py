@@ -0,0 +1,187 @@
+import os
+import re
+import json
+import random
+import hashlib
+import logging
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import DATABASE_PATH, Run
+
+logger = logging.getLogger(__name__)
+
+# off: never reuse; template: show the similar plan to the planner; direct: use it as is
+PLAN_REUSE = os.getenv("PLAN_REUSE", "off").lower()
+PLAN_REUSE_THRESHOLD = float(os.getenv("PLAN_REUSE_THRESHOLD", "0.8"))  # Estimated Jaccard similarity
+PLAN_INDEX_PATH = os.path.join(os.path.dirname(DATABASE_PATH), "plan_index.jsonl")
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bands of 4 rows: pairs above ~0.5 similarity usually share a bucket
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+@dataclass
+class PlanMatch:
+    run_id: str
+    similarity: float
+    plan: list[dict]
+
+
+def shingles(text: str) -> set[str]:
+    """Word 2-grams of the normalized text (single words for one-word texts)."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < 2:
+        return set(words)
+    return {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash(text: str) -> tuple[int, ...]:
+    """MinHash signature of a text's shingles."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for shingle in shingles(text)
+    ]
+    if not hashes:
+        return (_MERSENNE_PRIME,) * NUM_PERMUTATIONS
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+class PlanIndex:
+    """Similarity index over the problems and plans of completed runs.
+
+    Problems are MinHashed and bucketed with LSH so a lookup only compares
+    signatures of likely matches. Entries are appended to a JSONL file next
+    to the database, so the index updates incrementally and survives restarts.
+    Loading and adding are locked, since the backfill runs in a worker thread.
+    """
+
+    def __init__(self, path: str = PLAN_INDEX_PATH):
+        self.path = path
+        self._entries: dict[str, tuple[tuple[int, ...], list[dict]]] = {}
+        self._buckets: dict[tuple, list[str]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self):
+        """Read the index file, if it exists and was not read yet."""
+        with self._lock:
+            if self.loaded:
+                return
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # A partially written last line, e.g. after a crash
+                            continue
+                        self._insert(entry["run_id"], tuple(entry["signature"]), entry["plan"])
+            self.loaded = True
+        logger.info(f"Plan index loaded with {len(self._entries)} entries")
+
+    def __contains__(self, run_id: str) -> bool:
+        return run_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _insert(self, run_id: str, signature: tuple[int, ...], plan: list[dict]):
+        self._entries[run_id] = (signature, plan)
+        for band in range(LSH_BANDS):
+            key = (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+            self._buckets.setdefault(key, []).append(run_id)
+
+    def add(self, run_id: str, problem: str, plan: list[dict]):
+        """Index a completed run's problem and plan and persist it."""
+        self.add_all([(run_id, problem, plan)])
+
+    def add_all(self, runs: list[tuple[str, str, list[dict]]]):
+        """Index (run_id, problem, plan) tuples of completed runs and persist them."""
+        new = [
+            (run_id, minhash(problem), plan)
+            for run_id, problem, plan in runs
+            if run_id not in self._entries
+        ]
+        if not new:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                for run_id, signature, plan in new:
+                    # Another thread may have indexed it while the signature was computed
+                    if run_id in self._entries:
+                        continue
+                    self._insert(run_id, signature, plan)
+                    f.write(json.dumps({"run_id": run_id, "signature": signature, "plan": plan}) + "\n")
+
+    def find(self, problem: str, threshold: float = PLAN_REUSE_THRESHOLD) -> Optional[PlanMatch]:
+        """Return the most similar indexed plan at or above the threshold."""
+        signature = minhash(problem)
+        candidates = set()
+        for band in range(LSH_BANDS):
+            key = (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+            candidates.update(self._buckets.get(key, ()))
+
+        best = None
+        for run_id in candidates:
+            other, plan = self._entries[run_id]
+            similarity = sum(x == y for x, y in zip(signature, other)) / NUM_PERMUTATIONS
+            if similarity >= threshold and (best is None or similarity > best.similarity):
+                best = PlanMatch(run_id=run_id, similarity=similarity, plan=plan)
+        return best
+
+
+plan_index = PlanIndex()
+
+
+def get_plan_index() -> PlanIndex:
+    """Return the shared index, loading it from disk on first use."""
+    if not plan_index.loaded:
+        plan_index.load()
+    return plan_index
+
+
+async def backfill_plan_index(session: AsyncSession):
+    """Index completed runs that are missing from the index (e.g. on first enable).
+
+    Reading the index file and MinHashing run in a worker thread, so the
+    event loop keeps serving requests while a large history is indexed.
+    """
+    index = await asyncio.to_thread(get_plan_index)
+    result = await session.execute(
+        select(Run.run_id).where(Run.status == "completed")
+    )
+    missing = [run_id for run_id in result.scalars() if run_id not in index]
+
+    added = 0
+    # Chunk the IN clause to stay under SQLite's bound parameter limit
+    for start in range(0, len(missing), 500):
+        result = await session.execute(
+            select(Run.run_id, Run.problem, Run.state_data)
+            .where(Run.run_id.in_(missing[start:start + 500]))
+        )
+        runs = []
+        for run_id, problem, state_data in result:
+            # state_data is stored as a JSON-encoded string
+            if isinstance(state_data, str):
+                state_data = json.loads(state_data)
+            if state_data and state_data.get("plan"):
+                runs.append((run_id, problem, state_data["plan"]))
+        await asyncio.to_thread(index.add_all, runs)
+        added += len(runs)
+    logger.info(f"Plan index backfilled with {added} completed runs")
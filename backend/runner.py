@@ -1,17 +1,25 @@
 import os
+import copy
 import json
-import re
+import random
+import asyncio
 import logging
+from collections import deque
 from datetime import datetime
 from typing import TypedDict, Annotated, Sequence
-from operator import add
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langgraph.graph import StateGraph, END
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import Run, Event as DBEvent
+from database import Run
+from json_stream import JSONArrayStreamParser
+from status_cache import status_cache, STATUS_FIELDS
+from snapshots import record_event
+from loop_monitor import loop_monitor, run_cpu_bound
+from plan_index import get_plan_index, PLAN_REUSE
+from hedging import hedge_policy
 
 logger = logging.getLogger(__name__)
 
@@ -20,16 +28,45 @@ MAX_PROBLEM_LENGTH = 3000  # Truncate very long problems
 MAX_STEP_OUTPUT_LENGTH = 1500  # Truncate step outputs for context
 MAX_CONTEXT_STEPS = 2  # Only include last N steps in context
 MAX_MESSAGES_IN_CONTEXT = 4  # Only keep last N messages for API calls
+GRAPH_RECURSION_LIMIT = 50  # Graph node executions per run; each plan step takes two
+
+# Verification policies: how step outputs are checked against their checklist
+VERIFICATION_POLICIES = ("per_step", "batched", "sampled", "off")
+
+def append_messages(window: deque, new: Sequence[BaseMessage]) -> deque:
+    """Reducer for StepChainState.messages: append into a bounded ring buffer.
+    
+    Only the last MAX_MESSAGES_IN_CONTEXT messages are ever sent to the model,
+    so older messages fall off the front in O(1) instead of piling up.
+    """
+    if not isinstance(window, deque) or window.maxlen != MAX_MESSAGES_IN_CONTEXT:
+        window = deque(window or (), maxlen=MAX_MESSAGES_IN_CONTEXT)
+    window.extend(new)
+    return window
+
+def step_number_key(value) -> int | None:
+    """Normalise a step number from model output ("1", 1 or 1.0) for lookups."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 class StepChainState(TypedDict):
-    """State for the step-chain runner."""
+    """State for the step-chain runner.
+    
+    Nodes return only the keys they change; "messages" updates are the new
+    messages to append, never the existing history.
+    """
     run_id: str
     problem: str
-    messages: Annotated[Sequence[BaseMessage], add]
+    messages: Annotated[deque, append_messages]
     plan: list[dict]
     current_step: int
     step_outputs: list[str]
-    verification_results: list[bool]
+    verification_results: list[bool | None]  # None until verified, or if skipped
+    verification_policy: str
+    verification_sample_rate: float
+    sampled_steps: list[int]  # Step indices verified under the "sampled" policy
     final_output: str | None
     error: str | None
 
@@ -47,6 +84,11 @@ class StepChainRunner:
             anthropic_api_key=anthropic_key,
             max_tokens=4096
         )
+        
+        # (message, task) for step 1 when it was started while the plan streamed
+        self._prefetched_step = None
+        # Run whose plan was used as is (PLAN_REUSE=direct)
+        self._plan_reused_from = None
     
     def truncate_text(self, text: str, max_length: int) -> str:
         """Truncate text to max length with ellipsis."""
@@ -54,8 +96,12 @@ class StepChainRunner:
             return text
         return text[:max_length] + "...[truncated]"
     
+    async def invoke_model(self, node: str, messages: list[BaseMessage]):
+        """Call the model for a graph node, hedging slow calls when enabled."""
+        return await hedge_policy.call(node, lambda: self.model.ainvoke(messages))
+    
     async def emit_event(self, run_id: str, event_type: str, data: dict):
-        """Emit an event to the database."""
+        """Emit an event to the database and update the run's snapshot."""
         # Truncate data for storage to prevent DB issues
         safe_data = {}
         for k, v in data.items():
@@ -64,12 +110,7 @@ class StepChainRunner:
             else:
                 safe_data[k] = v
         
-        event = DBEvent(
-            run_id=run_id,
-            type=event_type,
-            data=safe_data
-        )
-        self.session.add(event)
+        await record_event(self.session, run_id, event_type, safe_data)
         await self.session.commit()
     
     async def update_run(self, run_id: str, **kwargs):
@@ -84,42 +125,68 @@ class StepChainRunner:
         
         run.updated_at = datetime.utcnow()
         await self.session.commit()
+        status_cache.put(run_id, {name: getattr(run, name) for name in STATUS_FIELDS})
     
     def extract_json_from_response(self, text: str) -> list:
-        """Extract JSON array from response text, handling various formats."""
-        text = text.strip()
-        
-        # Try to find JSON in code blocks first
-        code_block_patterns = [
-            r'```json\s*([\s\S]*?)\s*```',
-            r'```\s*([\s\S]*?)\s*```',
-        ]
-        
-        for pattern in code_block_patterns:
-            match = re.search(pattern, text)
-            if match:
-                json_str = match.group(1).strip()
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    continue
-        
-        # Try to find JSON array directly
-        array_match = re.search(r'\[\s*\{[\s\S]*\}\s*\]', text)
-        if array_match:
-            try:
-                return json.loads(array_match.group())
-            except json.JSONDecodeError:
-                pass
+        """Extract a JSON array of objects from response text, preferring one in a code fence."""
+        parser = JSONArrayStreamParser()
+        parser.feed(text)
+        if parser.done:
+            return parser.objects
         
         # Last resort: try parsing the whole thing
         try:
-            return json.loads(text)
+            return json.loads(text.strip())
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON: {e}")
             raise
     
-    async def create_plan(self, state: StepChainState) -> StepChainState:
+    def build_step_prompt(self, problem: str, step: dict, step_outputs: list[str]) -> str:
+        """Build the prompt for executing a step."""
+        # Build LIMITED context from previous steps (only last N)
+        context = ""
+        if step_outputs:
+            recent_outputs = step_outputs[-MAX_CONTEXT_STEPS:]
+            start_idx = max(0, len(step_outputs) - MAX_CONTEXT_STEPS)
+            context = "\n\nPrevious steps summary:\n"
+            for i, output in enumerate(recent_outputs):
+                step_num = start_idx + i + 1
+                truncated_output = self.truncate_text(output, MAX_STEP_OUTPUT_LENGTH)
+                context += f"Step {step_num}: {truncated_output}\n"
+        
+        # Truncate problem for step execution
+        truncated_problem = self.truncate_text(problem, MAX_PROBLEM_LENGTH)
+        
+        return f"""Execute the following step to solve the problem.
+
+Original Problem: {truncated_problem}
+
+Current Step: {step['description']}
+{context}
+
+Provide a detailed response for completing this step. Be specific and thorough but concise (max 500 words)."""
+    
+    def prefetch_first_step(self, run_id: str, problem: str, step: dict):
+        """Start step 1's model call while the rest of the plan is still streaming.
+        
+        The plan is not complete yet, so this call runs without message history.
+        """
+        message = HumanMessage(content=self.build_step_prompt(problem, step, []))
+        
+        async def call_model():
+            loop_monitor.label_task(run_id=run_id, node="execute_step")
+            return await self.invoke_model("execute_step", [message])
+        
+        task = asyncio.create_task(call_model())
+        self._prefetched_step = (message, task)
+    
+    def cancel_prefetched_step(self):
+        """Cancel a prefetched step 1 call that will not be used."""
+        if self._prefetched_step:
+            self._prefetched_step[1].cancel()
+            self._prefetched_step = None
+    
+    async def create_plan(self, state: StepChainState) -> dict:
         """Create a plan by breaking down the problem into steps."""
         run_id = state["run_id"]
         problem = state["problem"]
@@ -129,6 +196,19 @@ class StepChainRunner:
         # Truncate very long problems
         truncated_problem = self.truncate_text(problem, MAX_PROBLEM_LENGTH)
         
+        # Look for the plan of a similar, already completed problem
+        match = None
+        if PLAN_REUSE in ("template", "direct"):
+            match = await run_cpu_bound(get_plan_index().find, problem)
+        
+        template = ""
+        if match:
+            logger.info(f"[RUN {run_id}] Similar plan found in run {match.run_id} ({match.similarity:.2f})")
+            template = f"""
+A very similar problem was solved before with the plan below. Reuse it where it fits and adapt it where it does not:
+{json.dumps(match.plan)}
+"""
+        
         prompt = f"""You are a problem-solving assistant. Break down the following problem into 3-5 clear, actionable steps.
 
 Problem: {truncated_problem}
@@ -136,7 +216,7 @@ Problem: {truncated_problem}
 For each step, provide:
 1. A clear description of what needs to be done (keep descriptions concise, max 100 words)
 2. A verification checklist (2-3 items) to confirm the step is complete
-
+{template}
 IMPORTANT: Return ONLY valid JSON. No markdown, no explanations.
 Return a JSON array in this exact format:
 [
@@ -150,10 +230,36 @@ Return a JSON array in this exact format:
         message = HumanMessage(content=prompt)
         
         try:
-            # Fresh call - no previous messages
-            response = await self.model.ainvoke([message])
-            
-            plan = self.extract_json_from_response(response.content)
+            if match and PLAN_REUSE == "direct":
+                # Skip the planning call entirely
+                plan = copy.deepcopy(match.plan)
+                messages = []
+                self._plan_reused_from = match.run_id
+            else:
+                # Fresh call - no previous messages. The plan is streamed so that
+                # step 1 can start as soon as its object is complete.
+                parser = JSONArrayStreamParser()
+                response = None
+                async for chunk in self.model.astream([message]):
+                    response = chunk if response is None else response + chunk
+                    restarts = parser.restarts
+                    steps = parser.feed(chunk.content)
+                    if parser.restarts != restarts:
+                        # The objects seen so far were not the plan (e.g. a code fence opened)
+                        self.cancel_prefetched_step()
+                    for step in steps:
+                        if self._prefetched_step is None and isinstance(step, dict) and "description" in step:
+                            self.prefetch_first_step(run_id, problem, step)
+                
+                if response is None:
+                    raise ValueError("Empty response from model")
+                
+                if parser.done:
+                    plan = parser.objects
+                else:
+                    self.cancel_prefetched_step()
+                    plan = await run_cpu_bound(self.extract_json_from_response, response.content)
+                messages = [message, response]
             
             # Validate plan structure
             if not isinstance(plan, list) or len(plan) == 0:
@@ -167,36 +273,46 @@ Return a JSON array in this exact format:
                 if "verification_checklist" not in step:
                     step["verification_checklist"] = ["Verify step completion"]
             
-            await self.emit_event(run_id, "plan_created", {
+            plan_event = {
                 "plan": plan,
                 "total_steps": len(plan)
-            })
+            }
+            if match:
+                plan_event["similar_run_id"] = match.run_id
+                plan_event["similarity"] = match.similarity
+                plan_event["reused"] = self._plan_reused_from is not None
+            await self.emit_event(run_id, "plan_created", plan_event)
             
             await self.update_run(run_id, total_steps=len(plan))
             
+            sampled_steps = []
+            if state["verification_policy"] == "sampled":
+                sampled_steps = self.sample_steps(plan, state["verification_sample_rate"])
+            
             return {
-                **state,
-                "messages": [message, response],
+                "messages": messages,
                 "plan": plan,
                 "current_step": 0,
                 "step_outputs": [],
-                "verification_results": []
+                "verification_results": [],
+                "sampled_steps": sampled_steps
             }
         except Exception as e:
+            self.cancel_prefetched_step()
             error_msg = f"Failed to create plan: {str(e)}"
             logger.error(f"[RUN {run_id}] {error_msg}")
             await self.emit_event(run_id, "run_failed", {"error": error_msg})
             await self.update_run(run_id, status="failed", error=error_msg)
-            return {**state, "error": error_msg}
+            return {"error": error_msg}
     
-    async def execute_step(self, state: StepChainState) -> StepChainState:
+    async def execute_step(self, state: StepChainState) -> dict:
         """Execute the current step."""
         run_id = state["run_id"]
         current_step = state["current_step"]
         plan = state["plan"]
         
         if current_step >= len(plan):
-            return state
+            return {}
         
         step = plan[current_step]
         
@@ -207,35 +323,17 @@ Return a JSON array in this exact format:
         
         await self.update_run(run_id, current_step_index=current_step)
         
-        # Build LIMITED context from previous steps (only last N)
-        context = ""
-        if state["step_outputs"]:
-            recent_outputs = state["step_outputs"][-MAX_CONTEXT_STEPS:]
-            start_idx = max(0, len(state["step_outputs"]) - MAX_CONTEXT_STEPS)
-            context = "\n\nPrevious steps summary:\n"
-            for i, output in enumerate(recent_outputs):
-                step_num = start_idx + i + 1
-                truncated_output = self.truncate_text(output, MAX_STEP_OUTPUT_LENGTH)
-                context += f"Step {step_num}: {truncated_output}\n"
-        
-        # Truncate problem for step execution
-        truncated_problem = self.truncate_text(state['problem'], MAX_PROBLEM_LENGTH)
-        
-        prompt = f"""Execute the following step to solve the problem.
-
-Original Problem: {truncated_problem}
-
-Current Step: {step['description']}
-{context}
-
-Provide a detailed response for completing this step. Be specific and thorough but concise (max 500 words)."""
-        
-        message = HumanMessage(content=prompt)
+        message = HumanMessage(content=self.build_step_prompt(state["problem"], step, state["step_outputs"]))
         
         try:
-            # Use only recent messages to avoid context length issues
-            recent_messages = state["messages"][-MAX_MESSAGES_IN_CONTEXT:] if len(state["messages"]) > MAX_MESSAGES_IN_CONTEXT else state["messages"]
-            response = await self.model.ainvoke(recent_messages + [message])
+            if current_step == 0 and self._prefetched_step:
+                # Started while the plan was still streaming
+                message, task = self._prefetched_step
+                self._prefetched_step = None
+                response = await task
+            else:
+                # The message window only holds recent messages, avoiding context length issues
+                response = await self.invoke_model("execute_step", list(state["messages"]) + [message])
             
             step_output = response.content
             
@@ -245,8 +343,7 @@ Provide a detailed response for completing this step. Be specific and thorough b
             })
             
             return {
-                **state,
-                "messages": state["messages"] + [message, response],
+                "messages": [message, response],
                 "step_outputs": state["step_outputs"] + [step_output]
             }
         except Exception as e:
@@ -254,9 +351,9 @@ Provide a detailed response for completing this step. Be specific and thorough b
             logger.error(f"[RUN {run_id}] {error_msg}")
             await self.emit_event(run_id, "run_failed", {"error": error_msg})
             await self.update_run(run_id, status="failed", error=error_msg)
-            return {**state, "error": error_msg}
+            return {"error": error_msg}
     
-    async def verify_step(self, state: StepChainState) -> StepChainState:
+    async def verify_step(self, state: StepChainState) -> dict:
         """Verify the current step using the checklist."""
         run_id = state["run_id"]
         current_step = state["current_step"]
@@ -283,8 +380,7 @@ Respond with ONLY "PASS" if all checklist items are satisfied, or "FAIL" followe
         
         try:
             # Use only recent messages
-            recent_messages = state["messages"][-MAX_MESSAGES_IN_CONTEXT:] if len(state["messages"]) > MAX_MESSAGES_IN_CONTEXT else state["messages"]
-            response = await self.model.ainvoke(recent_messages + [message])
+            response = await self.invoke_model("verify_step", list(state["messages"]) + [message])
             
             verification = response.content.strip()
             passed = verification.upper().startswith("PASS")
@@ -300,8 +396,7 @@ Respond with ONLY "PASS" if all checklist items are satisfied, or "FAIL" followe
                 })
             
             return {
-                **state,
-                "messages": state["messages"] + [message, response],
+                "messages": [message, response],
                 "verification_results": state["verification_results"] + [passed],
                 "current_step": current_step + 1
             }
@@ -313,20 +408,122 @@ Respond with ONLY "PASS" if all checklist items are satisfied, or "FAIL" followe
                 "step_number": step["step_number"]
             })
             return {
-                **state,
                 "verification_results": state["verification_results"] + [True],
                 "current_step": current_step + 1
             }
     
+    def sample_steps(self, plan: list[dict], rate: float) -> list[int]:
+        """Pick a risk-weighted random subset of step indices to verify.
+        
+        Steps with longer checklists have more ways to fail, so they are
+        weighted by checklist size (weighted sampling without replacement).
+        """
+        count = max(1, round(len(plan) * rate))
+        keyed = [
+            (random.random() ** (1 / max(1, len(step["verification_checklist"]))), i)
+            for i, step in enumerate(plan)
+        ]
+        return sorted(i for _, i in sorted(keyed, reverse=True)[:count])
+    
+    def route_after_execute(self, state: StepChainState) -> str:
+        """Decide whether the step just executed is verified now."""
+        if state.get("error"):
+            return "error"
+        policy = state["verification_policy"]
+        if policy == "per_step":
+            return "verify"
+        if policy == "sampled" and state["current_step"] in state["sampled_steps"]:
+            return "verify"
+        return "skip"
+    
+    async def skip_verification(self, state: StepChainState) -> dict:
+        """Advance to the next step without an inline verification call."""
+        return {
+            "verification_results": state["verification_results"] + [None],
+            "current_step": state["current_step"] + 1
+        }
+    
+    async def verify_all_steps(self, state: StepChainState) -> dict:
+        """Verify every step output in one structured call (batched policy)."""
+        run_id = state["run_id"]
+        plan = state["plan"]
+        
+        step_sections = []
+        for step, output in zip(plan, state["step_outputs"]):
+            checklist = chr(10).join(f'- {item}' for item in step["verification_checklist"])
+            truncated_output = self.truncate_text(output, MAX_STEP_OUTPUT_LENGTH)
+            step_sections.append(f"""Step {step['step_number']}: {step['description']}
+Step Output: {truncated_output}
+Verification Checklist:
+{checklist}""")
+        
+        prompt = f"""Verify if each of the following step outputs satisfies all of its checklist items.
+
+{(chr(10) * 2).join(step_sections)}
+
+IMPORTANT: Return ONLY valid JSON. No markdown, no explanations.
+Return a JSON array with one entry per step in this exact format:
+[
+  {{
+    "step_number": 1,
+    "passed": true,
+    "reason": "Brief reason if the step failed, otherwise empty"
+  }}
+]"""
+        
+        message = HumanMessage(content=prompt)
+        
+        try:
+            # Use only recent messages
+            response = await self.invoke_model("verify_all_steps", list(state["messages"]) + [message])
+            
+            items = await run_cpu_bound(self.extract_json_from_response, response.content)
+            # The model may return step numbers as strings
+            verdicts = {
+                step_number_key(item.get("step_number")): item
+                for item in items
+                if isinstance(item, dict)
+            }
+            messages = [message, response]
+        except Exception as e:
+            logger.error(f"[RUN {run_id}] Failed to verify steps: {str(e)}")
+            # Don't fail the whole run on verification error, just mark as passed
+            verdicts = {}
+            messages = []
+        
+        verification_results = []
+        for step in plan:
+            # Steps missing from the response are treated like a verification error
+            verdict = verdicts.get(step_number_key(step["step_number"]), {"passed": True})
+            passed = verdict.get("passed") is not False
+            
+            if passed:
+                await self.emit_event(run_id, "verify_pass", {
+                    "step_number": step["step_number"]
+                })
+            else:
+                await self.emit_event(run_id, "verify_fail", {
+                    "step_number": step["step_number"],
+                    "reason": self.truncate_text(str(verdict.get("reason", "")), 500)
+                })
+            verification_results.append(passed)
+        
+        return {
+            "messages": messages,
+            "verification_results": verification_results
+        }
+    
     def should_continue(self, state: StepChainState) -> str:
         """Decide if we should continue to next step or finish."""
         if state.get("error"):
             return "error"
         if state["current_step"] >= len(state["plan"]):
+            if state["verification_policy"] == "batched":
+                return "verify_all"
             return "finish"
         return "continue"
     
-    async def generate_final_output(self, state: StepChainState) -> StepChainState:
+    async def generate_final_output(self, state: StepChainState) -> dict:
         """Generate final output summary."""
         run_id = state["run_id"]
         
@@ -351,8 +548,7 @@ Provide a clear, concise final answer to the original problem (max 500 words).""
         
         try:
             # Use only recent messages
-            recent_messages = state["messages"][-MAX_MESSAGES_IN_CONTEXT:] if len(state["messages"]) > MAX_MESSAGES_IN_CONTEXT else state["messages"]
-            response = await self.model.ainvoke(recent_messages + [message])
+            response = await self.invoke_model("generate_final", list(state["messages"]) + [message])
             
             final_output = response.content
             
@@ -367,9 +563,8 @@ Provide a clear, concise final answer to the original problem (max 500 words).""
             )
             
             return {
-                **state,
                 "final_output": final_output,
-                "messages": state["messages"] + [message, response]
+                "messages": [message, response]
             }
         except Exception as e:
             error_msg = f"Failed to generate final output: {str(e)}"
@@ -385,43 +580,71 @@ Provide a clear, concise final answer to the original problem (max 500 words).""
                 final_output=basic_output
             )
             return {
-                **state,
                 "final_output": basic_output
             }
     
+    def labelled(self, name: str, node):
+        """Wrap a node so loop blocking reports are attributed to its run and name."""
+        async def run_node(state: StepChainState) -> dict:
+            loop_monitor.label_task(run_id=state["run_id"], node=name)
+            return await node(state)
+        return run_node
+    
     def build_graph(self) -> StateGraph:
         """Build the LangGraph workflow."""
         workflow = StateGraph(StepChainState)
         
         # Add nodes
-        workflow.add_node("create_plan", self.create_plan)
-        workflow.add_node("execute_step", self.execute_step)
-        workflow.add_node("verify_step", self.verify_step)
-        workflow.add_node("generate_final", self.generate_final_output)
+        workflow.add_node("create_plan", self.labelled("create_plan", self.create_plan))
+        workflow.add_node("execute_step", self.labelled("execute_step", self.execute_step))
+        workflow.add_node("verify_step", self.labelled("verify_step", self.verify_step))
+        workflow.add_node("skip_verification", self.labelled("skip_verification", self.skip_verification))
+        workflow.add_node("verify_all_steps", self.labelled("verify_all_steps", self.verify_all_steps))
+        workflow.add_node("generate_final", self.labelled("generate_final", self.generate_final_output))
         
         # Set entry point
         workflow.set_entry_point("create_plan")
         
         # Add edges
         workflow.add_edge("create_plan", "execute_step")
-        workflow.add_edge("execute_step", "verify_step")
-        
         workflow.add_conditional_edges(
-            "verify_step",
-            self.should_continue,
+            "execute_step",
+            self.route_after_execute,
             {
-                "continue": "execute_step",
-                "finish": "generate_final",
+                "verify": "verify_step",
+                "skip": "skip_verification",
                 "error": END
             }
         )
         
+        for node in ("verify_step", "skip_verification"):
+            workflow.add_conditional_edges(
+                node,
+                self.should_continue,
+                {
+                    "continue": "execute_step",
+                    "verify_all": "verify_all_steps",
+                    "finish": "generate_final",
+                    "error": END
+                }
+            )
+        
+        workflow.add_edge("verify_all_steps", "generate_final")
         workflow.add_edge("generate_final", END)
         
         return workflow.compile()
     
-    async def run(self, run_id: str, problem: str):
+    async def run(
+        self,
+        run_id: str,
+        problem: str,
+        verification_policy: str = "per_step",
+        verification_sample_rate: float = 0.5
+    ):
         """Run the complete step-chain process."""
+        if verification_policy not in VERIFICATION_POLICIES:
+            raise ValueError(f"Unknown verification policy: {verification_policy}")
+        
         graph = self.build_graph()
         
         initial_state: StepChainState = {
@@ -432,13 +655,16 @@ Provide a clear, concise final answer to the original problem (max 500 words).""
             "current_step": 0,
             "step_outputs": [],
             "verification_results": [],
+            "verification_policy": verification_policy,
+            "verification_sample_rate": verification_sample_rate,
+            "sampled_steps": [],
             "final_output": None,
             "error": None
         }
         
         try:
             # Increase recursion limit for complex problems
-            config = {"recursion_limit": 50}
+            config = {"recursion_limit": GRAPH_RECURSION_LIMIT}
             final_state = await graph.ainvoke(initial_state, config=config)
             
             # Save final state to database (with truncation)
@@ -455,7 +681,21 @@ Provide a clear, concise final answer to the original problem (max 500 words).""
             except Exception as e:
                 logger.error(f"[RUN {run_id}] Failed to save state data: {e}")
             
+            # Make the plan available to similar future problems
+            if (
+                PLAN_REUSE in ("template", "direct")
+                and final_state.get("final_output")
+                and not final_state.get("error")
+                and self._plan_reused_from is None
+            ):
+                try:
+                    get_plan_index().add(run_id, problem, final_state["plan"])
+                except Exception as e:
+                    logger.error(f"[RUN {run_id}] Failed to index plan: {e}")
+            
         except Exception as e:
             logger.error(f"[RUN {run_id}] Run failed with error: {e}")
             await self.emit_event(run_id, "run_failed", {"error": str(e)})
             await self.update_run(run_id, status="failed", error=str(e))
+        finally:
+            self.cancel_prefetched_step()
@@ -1,13 +1,18 @@
 import asyncio
+import importlib
+import json
 import uuid
 import os
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Literal, Optional
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sse_starlette.sse import EventSourceResponse
 
@@ -18,18 +23,92 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from database import init_db, get_session, async_session_maker, Run, Event as DBEvent
-from models import CreateRunRequest, CreateRunResponse, RunStatus
-from runner import StepChainRunner
+from database import (
+    init_db, get_session, async_session_maker, Run, Batch,
+    Event as DBEvent, RunSnapshot as DBRunSnapshot
+)
+from models import (
+    CreateRunRequest, CreateRunResponse, RunStatus, RunOptions,
+    CreateBatchRequest, CreateBatchResponse, BatchStatus, RunSnapshot
+)
+from status_cache import status_cache, STATUS_FIELDS
+from snapshots import record_event, rebuild_snapshot
+from loop_monitor import loop_monitor, run_cpu_bound
+from plan_index import backfill_plan_index, PLAN_REUSE
+from hedging import hedge_policy
+from export import connect_readonly, iter_chunks, to_ndjson, to_csv
 
 # Background task tracking
 background_tasks = {}
 
+# Runs being cancelled via the API; any other cancellation of a run is propagated
+cancelled_runs = set()
+
+# Import of the runner module, which pulls in the LLM/graph stack (see load_runner)
+runner_import: asyncio.Task | None = None
+
+# Maximum number of runs from one batch executing at the same time
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+MAX_STATUS_WAIT = 60  # Upper bound in seconds for ?wait= long-polling
+BATCH_RESULTS_IDLE_TIMEOUT = 300  # Seconds without a finished run before the results stream closes
+# Finished runs are fetched by updated_at; rows may commit this long after their timestamp
+BATCH_RESULTS_WATERMARK_SLACK = timedelta(seconds=30)
+
+def load_runner() -> asyncio.Task:
+    """Import the runner module in a worker thread, once.
+    
+    langchain and langgraph are slow to import, so they are kept out of
+    server start-up and loaded on first use (or by the warm-up). An import
+    that was cancelled or failed is started again.
+    """
+    global runner_import
+    if runner_import is None or (
+        runner_import.done()
+        and (runner_import.cancelled() or runner_import.exception() is not None)
+    ):
+        runner_import = asyncio.create_task(asyncio.to_thread(importlib.import_module, "runner"))
+    return runner_import
+
+def runner_ready() -> bool:
+    """Whether the runner module has been imported successfully."""
+    return (
+        runner_import is not None
+        and runner_import.done()
+        and not runner_import.cancelled()
+        and runner_import.exception() is None
+    )
+
+async def create_runner(session: AsyncSession):
+    """Create a StepChainRunner, importing the runner module if needed."""
+    # Shielded: cancelling one run must not cancel the import shared by all runs
+    runner_module = await asyncio.shield(load_runner())
+    return runner_module.StepChainRunner(session)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on startup."""
+    """Initialize database on startup and optionally warm up the runner."""
     await init_db()
+    loop_monitor.start()
+    plan_backfill = None
+    if PLAN_REUSE in ("template", "direct"):
+        # Indexing a large history takes a while; reuse lookups miss those runs until done
+        plan_backfill = asyncio.create_task(backfill_plan_index_in_background())
+    if os.getenv("RUNNER_WARMUP", "true").lower() == "true":
+        # Runs in the background so /health answers immediately
+        load_runner()
     yield
+    if plan_backfill:
+        plan_backfill.cancel()
+    loop_monitor.stop()
+
+async def backfill_plan_index_in_background():
+    """Index completed runs that are missing from the plan index."""
+    try:
+        async with async_session_maker() as session:
+            await backfill_plan_index(session)
+    except Exception as e:
+        logger.error(f"Failed to backfill plan index: {e}")
 
 app = FastAPI(
     title="Step-Chain Runner API",
@@ -77,24 +156,81 @@ async def create_run(
     )
     session.add(run)
     await session.commit()
+    status_cache.put(run_id, {name: getattr(run, name) for name in STATUS_FIELDS})
     logger.info(f"[RUN {run_id}] Run created in database")
     
     # Schedule background task with FastAPI's BackgroundTasks
-    bg_tasks.add_task(run_chain, run_id, request.problem)
+    bg_tasks.add_task(run_chain, run_id, request.problem, request)
     logger.info(f"[RUN {run_id}] Background task scheduled")
     
     return CreateRunResponse(run_id=run_id)
 
-async def run_chain(run_id: str, problem: str):
-    """Background task to run the chain."""
-    logger.info(f"[RUN {run_id}] Starting background task...")
-    try:
+async def claim_run(session: AsyncSession, run_id: str) -> bool:
+    """Move a queued run to running; False if it is no longer queued.
+    
+    The status check and update are one statement, so a run cancelled while
+    queued (e.g. waiting in a batch) is never started.
+    """
+    now = datetime.utcnow()
+    result = await session.execute(
+        update(Run)
+        .where(Run.run_id == run_id)
+        .where(Run.status == "queued")
+        .values(status="running", started_at=now, updated_at=now)
+    )
+    await session.commit()
+    if not result.rowcount:
+        return False
+    
+    result = await session.execute(
+        select(*(getattr(Run, name) for name in STATUS_FIELDS))
+        .where(Run.run_id == run_id)
+    )
+    status_cache.put(run_id, result.one()._asdict())
+    return True
+
+async def execute_run(run_id: str, problem: str, options: RunOptions):
+    """Run the chain for one run, enforcing its deadline if it has one."""
+    async with asyncio.timeout(options.deadline_seconds):
         async with async_session_maker() as session:
+            if not await claim_run(session, run_id):
+                logger.info(f"[RUN {run_id}] Cancelled before it started")
+                return
+            
             logger.info(f"[RUN {run_id}] Session created, initializing runner...")
-            runner = StepChainRunner(session)
+            runner = await create_runner(session)
             logger.info(f"[RUN {run_id}] Runner initialized, starting execution...")
-            await runner.run(run_id, problem)
+            await runner.run(
+                run_id,
+                problem,
+                verification_policy=options.verification_policy,
+                verification_sample_rate=options.verification_sample_rate
+            )
             logger.info(f"[RUN {run_id}] Runner completed successfully")
+
+async def run_chain(run_id: str, problem: str, options: RunOptions):
+    """Background task to run the chain."""
+    logger.info(f"[RUN {run_id}] Starting background task...")
+    
+    # Run in a separate task so DELETE /api/runs/{run_id} can cancel it
+    task = asyncio.create_task(execute_run(run_id, problem, options))
+    background_tasks[run_id] = task
+    try:
+        await task
+    except asyncio.CancelledError:
+        if run_id not in cancelled_runs:
+            # This background task itself is being cancelled (e.g. shutdown or
+            # its batch being cancelled); don't leave the run marked as running
+            logger.info(f"[RUN {run_id}] Interrupted")
+            await mark_run_cancelled(run_id, "Interrupted before finishing")
+            raise
+        # Cancelled via the API. Record it here too, in case the runner
+        # overwrote the status after the API marked the run cancelled.
+        logger.info(f"[RUN {run_id}] Cancelled")
+        await mark_run_cancelled(run_id, "Cancelled by request")
+    except TimeoutError:
+        logger.info(f"[RUN {run_id}] Deadline of {options.deadline_seconds}s exceeded")
+        await mark_run_cancelled(run_id, f"Deadline of {options.deadline_seconds}s exceeded")
     except Exception as e:
         logger.error(f"[RUN {run_id}] ERROR: {e}")
         import traceback
@@ -109,42 +245,338 @@ async def run_chain(run_id: str, problem: str):
                 if run:
                     run.status = "failed"
                     run.error = str(e)
+                    run.updated_at = datetime.utcnow()
                     await session.commit()
+                    status_cache.put(run_id, {name: getattr(run, name) for name in STATUS_FIELDS})
         except Exception as e2:
             logger.error(f"[RUN {run_id}] Failed to update error status: {e2}")
+    finally:
+        background_tasks.pop(run_id, None)
+        cancelled_runs.discard(run_id)
+
+async def mark_run_cancelled(run_id: str, reason: str) -> bool:
+    """Mark an unfinished run as cancelled and emit a run_cancelled event.
+    
+    Returns False if the run does not exist or had already finished.
+    """
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Run).where(Run.run_id == run_id)
+        )
+        run = result.scalar_one_or_none()
+        if not run or run.status in FINISHED_STATUSES:
+            return False
+        
+        run.status = "cancelled"
+        run.error = reason
+        run.updated_at = datetime.utcnow()
+        await record_event(session, run_id, "run_cancelled", {"error": reason})
+        await session.commit()
+        status_cache.put(run_id, {name: getattr(run, name) for name in STATUS_FIELDS})
+        return True
+
+@app.post("/api/runs/batch", response_model=CreateBatchResponse)
+async def create_batch(
+    request: CreateBatchRequest,
+    bg_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Create one run per problem in a single request.
+    
+    All runs are inserted in one transaction and executed by a bounded
+    pool of workers (BATCH_MAX_CONCURRENCY) instead of one task per run.
+    """
+    batch_id = str(uuid.uuid4())
+    items = [(str(uuid.uuid4()), problem) for problem in request.problems]
+    logger.info(f"[BATCH {batch_id}] Creating batch with {len(items)} runs...")
+    
+    session.add(Batch(batch_id=batch_id, total_runs=len(items)))
+    session.add_all([
+        Run(run_id=run_id, problem=problem, status="queued", batch_id=batch_id)
+        for run_id, problem in items
+    ])
+    await session.commit()
+    logger.info(f"[BATCH {batch_id}] Batch created in database")
+    
+    bg_tasks.add_task(run_batch, batch_id, items, request)
+    logger.info(f"[BATCH {batch_id}] Background task scheduled")
+    
+    return CreateBatchResponse(batch_id=batch_id, run_ids=[run_id for run_id, _ in items])
+
+async def run_batch(batch_id: str, items: list[tuple[str, str]], options: RunOptions):
+    """Background task to run a batch through a bounded pool of workers."""
+    pending = iter(items)
+    
+    async def worker():
+        # Workers share one iterator, so each run is picked up exactly once
+        for run_id, problem in pending:
+            await run_chain(run_id, problem, options)
+    
+    worker_count = min(BATCH_MAX_CONCURRENCY, len(items))
+    logger.info(f"[BATCH {batch_id}] Starting {worker_count} workers...")
+    await asyncio.gather(*(worker() for _ in range(worker_count)))
+    logger.info(f"[BATCH {batch_id}] All runs finished")
+
+async def get_batch_progress(session: AsyncSession, batch: Batch) -> BatchStatus:
+    """Count the runs of a batch by status."""
+    result = await session.execute(
+        select(Run.status, func.count())
+        .where(Run.batch_id == batch.batch_id)
+        .group_by(Run.status)
+    )
+    counts = dict(result.all())
+    
+    return BatchStatus(
+        batch_id=batch.batch_id,
+        total_runs=batch.total_runs,
+        queued=counts.get("queued", 0),
+        running=counts.get("running", 0),
+        completed=counts.get("completed", 0),
+        failed=counts.get("failed", 0),
+        cancelled=counts.get("cancelled", 0),
+        created_at=batch.created_at
+    )
+
+@app.get("/api/batches/{batch_id}", response_model=BatchStatus)
+async def get_batch_status(
+    batch_id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Get aggregate progress counters for a batch.
+    """
+    batch = await session.get(Batch, batch_id)
+    
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    return await get_batch_progress(session, batch)
+
+@app.get("/api/batches/{batch_id}/results")
+async def stream_batch_results(
+    batch_id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Stream batch results as NDJSON, one line per run as it finishes.
+    
+    Each line carries the run result plus the batch progress counters at
+    the time it was written. The stream closes once every run has finished,
+    or with a final line holding an error and the progress counters if no
+    run finishes for BATCH_RESULTS_IDLE_TIMEOUT seconds (e.g. the batch was
+    interrupted by a restart).
+    """
+    if not await session.get(Batch, batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    async def result_generator():
+        async with async_session_maker() as session:
+            batch = await session.get(Batch, batch_id)
+            emitted = set()
+            watermark = None  # Latest updated_at of an emitted run
+            idle = 0.0
+            
+            while len(emitted) < batch.total_runs:
+                # Only fetch ids first so finished outputs are loaded once
+                query = (
+                    select(Run.run_id, Run.updated_at)
+                    .where(Run.batch_id == batch_id)
+                    .where(Run.status.in_(FINISHED_STATUSES))
+                )
+                if watermark:
+                    # updated_at only moves forward, so finished runs older than this were emitted
+                    query = query.where(Run.updated_at >= watermark - BATCH_RESULTS_WATERMARK_SLACK)
+                result = await session.execute(query)
+                new_runs = [(run_id, updated_at) for run_id, updated_at in result if run_id not in emitted]
+                
+                if new_runs:
+                    idle = 0.0
+                    watermark = max([watermark or datetime.min] + [updated_at for _, updated_at in new_runs])
+                    new_ids = [run_id for run_id, _ in new_runs]
+                    progress = (await get_batch_progress(session, batch)).model_dump(mode="json")
+                    
+                    # Chunk the IN clause to stay under SQLite's bound parameter limit
+                    for start in range(0, len(new_ids), 500):
+                        result = await session.execute(
+                            select(Run.run_id, Run.status, Run.final_output, Run.error)
+                            .where(Run.run_id.in_(new_ids[start:start + 500]))
+                        )
+                        for row in result:
+                            emitted.add(row.run_id)
+                            yield json.dumps({
+                                "run_id": row.run_id,
+                                "status": row.status,
+                                "final_output": row.final_output,
+                                "error": row.error,
+                                "progress": progress
+                            }) + "\n"
+                    continue
+                
+                if idle >= BATCH_RESULTS_IDLE_TIMEOUT:
+                    progress = (await get_batch_progress(session, batch)).model_dump(mode="json")
+                    yield json.dumps({
+                        "error": f"No run finished in the last {BATCH_RESULTS_IDLE_TIMEOUT}s",
+                        "progress": progress
+                    }) + "\n"
+                    return
+                
+                # Wait before polling again
+                await asyncio.sleep(0.5)
+                idle += 0.5
+    
+    return StreamingResponse(result_generator(), media_type="application/x-ndjson")
+
+async def load_run_status(session: AsyncSession, run_id: str) -> dict | None:
+    """Get a run's status fields from the cache, falling back to the database.
+    
+    The database query only selects the status columns, leaving the
+    problem and state_data blobs unread.
+    """
+    fields = status_cache.get(run_id)
+    if fields is None:
+        result = await session.execute(
+            select(*(getattr(Run, name) for name in STATUS_FIELDS))
+            .where(Run.run_id == run_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        # The runner may have cached a newer status while the query ran
+        fields = status_cache.get(run_id)
+        if fields is None:
+            fields = row._asdict()
+            status_cache.put(run_id, fields)
+    return fields
+
+def status_etag(fields: dict) -> str:
+    """Entity tag for a run status; changes whenever the run row is updated."""
+    return f'"{fields["status"]}-{fields["current_step_index"]}-{fields["updated_at"].timestamp()}"'
 
 @app.get("/api/runs/{run_id}", response_model=RunStatus)
 async def get_run_status(
     run_id: str,
+    request: Request,
+    response: Response,
+    wait: float = Query(0, ge=0, le=MAX_STATUS_WAIT, description="Long-poll for up to this many seconds"),
     session: AsyncSession = Depends(get_session)
 ):
     """
     Get the current status of a run.
+    
+    Responses carry an ETag; a matching If-None-Match returns 304. With
+    ?wait=N the request is held until the status or step index changes
+    (or N seconds pass) unless the client's ETag is already stale.
     """
-    result = await session.execute(
-        select(Run).where(Run.run_id == run_id)
-    )
-    run = result.scalar_one_or_none()
+    fields = await load_run_status(session, run_id)
+    
+    if not fields:
+        raise HTTPException(status_code=404, detail="Run not found")
+    
+    if_none_match = request.headers.get("if-none-match")
+    client_is_current = if_none_match is None or if_none_match == status_etag(fields)
+    
+    if wait and client_is_current and fields["status"] not in FINISHED_STATUSES:
+        baseline = (fields["status"], fields["current_step_index"])
+        deadline = asyncio.get_running_loop().time() + wait
+        while (fields["status"], fields["current_step_index"]) == baseline:
+            # Return the pooled connection of a cache-miss query while waiting
+            await session.close()
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0 or not await status_cache.wait_for_update(run_id, remaining):
+                break
+            fields = await load_run_status(session, run_id)
+    
+    etag = status_etag(fields)
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    return RunStatus(**fields)
+
+@app.delete("/api/runs/{run_id}", response_model=RunStatus)
+async def cancel_run(
+    run_id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Cancel a queued or running run.
+    
+    The in-flight model call is cancelled and the run's database session
+    released before the response is sent.
+    """
+    fields = await load_run_status(session, run_id)
     
-    if not run:
+    if not fields:
         raise HTTPException(status_code=404, detail="Run not found")
+    if fields["status"] in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Run already {fields['status']}")
+    
+    async def cancel_task():
+        task = background_tasks.get(run_id)
+        if task:
+            cancelled_runs.add(run_id)
+            task.cancel()
+            await asyncio.wait({task})
+    
+    await cancel_task()
+    if await mark_run_cancelled(run_id, "Cancelled by request"):
+        logger.info(f"[RUN {run_id}] Cancelled by request")
+    # A batch worker may have started the run while it was being marked
+    await cancel_task()
+    
+    return RunStatus(**await load_run_status(session, run_id))
+
+@app.get("/api/runs/{run_id}/snapshot", response_model=RunSnapshot)
+async def get_run_snapshot(
+    run_id: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Get the materialized state of a run: plan, per-step status, output and
+    verification, and the final output or error.
     
-    return RunStatus(
-        run_id=run.run_id,
-        status=run.status,
-        current_step_index=run.current_step_index,
-        total_steps=run.total_steps,
-        started_at=run.started_at,
-        updated_at=run.updated_at,
-        final_output=run.final_output,
-        error=run.error
+    The snapshot is maintained as events are emitted, so this is a single
+    row read. `version` is the id of the last event it includes; pass it as
+    ?after= to the events stream to receive only later events.
+    """
+    fields = await load_run_status(session, run_id)
+    
+    if not fields:
+        raise HTTPException(status_code=404, detail="Run not found")
+    
+    snapshot = await session.get(DBRunSnapshot, run_id)
+    if snapshot:
+        version, data = snapshot.version, snapshot.data
+    else:
+        # Runs created before snapshots existed: replay the log once
+        version, data = await rebuild_snapshot(session, run_id)
+        if version and fields["status"] in FINISHED_STATUSES:
+            session.add(DBRunSnapshot(run_id=run_id, version=version, data=data))
+            try:
+                await session.commit()
+            except IntegrityError:
+                # A concurrent request stored it first
+                await session.rollback()
+    
+    return RunSnapshot(
+        run_id=run_id,
+        version=version,
+        **{**data, "status": fields["status"]}
     )
 
 @app.get("/api/runs/{run_id}/events")
-async def stream_run_events(run_id: str):
+async def stream_run_events(
+    run_id: str,
+    request: Request,
+    after: int = Query(0, ge=0, description="Only stream events with an id greater than this (e.g. a snapshot version)")
+):
     """
     Stream real-time events for a run via Server-Sent Events (SSE).
     
+    Each message carries the event id, so reconnecting clients resume via
+    the Last-Event-ID header; ?after= resumes from a snapshot version.
+    
     Event types:
     - plan_created: Initial plan generated
     - step_started: Step execution begins
@@ -153,6 +585,7 @@ async def stream_run_events(run_id: str):
     - verify_fail: Step verification failed
     - run_completed: Run finished successfully
     - run_failed: Run encountered an error
+    - run_cancelled: Run was cancelled or exceeded its deadline
     """
     
     async def event_generator():
@@ -171,7 +604,8 @@ async def stream_run_events(run_id: str):
                 }
                 return
             
-            last_event_id = 0
+            last_event_header = request.headers.get("last-event-id", "")
+            last_event_id = max(after, int(last_event_header) if last_event_header.isdigit() else 0)
             timeout_counter = 0
             max_timeout = 300  # 5 minutes max wait
             
@@ -186,15 +620,15 @@ async def stream_run_events(run_id: str):
                 events = result.scalars().all()
                 
                 for event in events:
-                    import json
                     event_data = {
                         "ts": event.ts.isoformat(),
                         "type": event.type,
                         "data": event.data
                     }
                     yield {
+                        "id": str(event.id),
                         "event": "message",
-                        "data": json.dumps(event_data)
+                        "data": await run_cpu_bound(json.dumps, event_data)
                     }
                     last_event_id = event.id
                 
@@ -204,7 +638,7 @@ async def stream_run_events(run_id: str):
                 )
                 run = result.scalar_one()
                 
-                if run.status in ["completed", "failed"]:
+                if run.status in FINISHED_STATUSES:
                     # Send final status and close connection
                     break
                 
@@ -214,10 +648,62 @@ async def stream_run_events(run_id: str):
     
     return EventSourceResponse(event_generator())
 
+@app.get("/api/export/{table}")
+async def export_table(
+    table: Literal["runs", "events"],
+    output_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    status: Optional[list[str]] = Query(None, description="Only runs with these statuses"),
+    since: Optional[datetime] = Query(None, description="Start of the time range (inclusive)"),
+    until: Optional[datetime] = Query(None, description="End of the time range (exclusive)"),
+    cursor: int = Query(0, ge=0, description="Resume after this cursor")
+):
+    """
+    Stream runs or events for offline analysis.
+    
+    Rows are read in chunks from a read-only snapshot connection, so memory
+    stays bounded and live writers are not blocked. Every row carries a
+    `cursor`; pass the last one received as ?cursor= to resume.
+    """
+    def generate_rows():
+        # A sync generator, so Starlette runs the SQLite reads in its thread pool
+        conn = connect_readonly()
+        try:
+            header = True
+            for rows in iter_chunks(conn, table, cursor, status, since, until):
+                if output_format == "ndjson":
+                    yield "".join(to_ndjson(row) for row in rows)
+                else:
+                    yield to_csv(rows, table, header=header)
+                    header = False
+        finally:
+            conn.close()
+    
+    media_type = "application/x-ndjson" if output_format == "ndjson" else "text/csv"
+    return StreamingResponse(generate_rows(), media_type=media_type)
+
+@app.get("/api/metrics/loop")
+async def get_loop_metrics():
+    """
+    Event-loop lag percentiles, plus recent blocking-callback reports
+    (with stack, run_id and node) when LOOP_BLOCKING_DEBUG is enabled.
+    """
+    return {
+        "lag": loop_monitor.stats(),
+        "blocking_calls": list(loop_monitor.blocking_calls)
+    }
+
+@app.get("/api/metrics/hedging")
+async def get_hedging_metrics():
+    """
+    Hedged model request counters (calls, hedges fired, hedges won) and the
+    per-node latency after which calls are hedged.
+    """
+    return hedge_policy.stats()
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """Health check endpoint. `ready` is true once the runner is loaded."""
+    return {"status": "healthy", "ready": runner_ready()}
 
 if __name__ == "__main__":
     import uvicorn
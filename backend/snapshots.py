@@ -0,0 +1,95 @@
+import copy
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Event as DBEvent, RunSnapshot as DBRunSnapshot
+
+
+def empty_snapshot() -> dict:
+    """Snapshot of a run before any event was emitted."""
+    return {
+        "status": "queued",
+        "total_steps": 0,
+        "steps": [],
+        "final_output": None,
+        "error": None,
+    }
+
+
+def apply_event(snapshot: dict, event_type: str, data: dict) -> dict:
+    """Return a new snapshot with one event applied.
+
+    The snapshot holds what a client would otherwise rebuild by replaying the
+    event log: the plan, per-step status/output/verification and the outcome.
+    """
+    snapshot = copy.deepcopy(snapshot)
+    steps = {step["step_number"]: step for step in snapshot["steps"]}
+    step = steps.get(data.get("step_number"))
+
+    if event_type == "plan_created":
+        snapshot["status"] = "running"
+        snapshot["total_steps"] = data.get("total_steps", len(data.get("plan", [])))
+        snapshot["steps"] = [
+            {
+                "step_number": planned.get("step_number", i + 1),
+                "description": planned.get("description", ""),
+                "verification_checklist": planned.get("verification_checklist", []),
+                "status": "pending",
+                "output": None,
+                "verified": None,
+                "verify_reason": None,
+            }
+            for i, planned in enumerate(data.get("plan", []))
+        ]
+    elif event_type == "step_started" and step:
+        step["status"] = "running"
+    elif event_type == "step_output" and step:
+        step["status"] = "completed"
+        step["output"] = data.get("output")
+    elif event_type in ("verify_pass", "verify_fail") and step:
+        step["verified"] = event_type == "verify_pass"
+        step["verify_reason"] = data.get("reason")
+    elif event_type == "run_completed":
+        snapshot["status"] = "completed"
+        snapshot["final_output"] = data.get("final_output")
+    elif event_type in ("run_failed", "run_cancelled"):
+        snapshot["status"] = "failed" if event_type == "run_failed" else "cancelled"
+        snapshot["error"] = data.get("error")
+
+    return snapshot
+
+
+async def record_event(session: AsyncSession, run_id: str, event_type: str, data: dict) -> DBEvent:
+    """Add an event and fold it into the run's snapshot, in the caller's transaction.
+
+    The snapshot version is the id of the last event applied, so SSE clients
+    can resume the event stream right after it.
+    """
+    event = DBEvent(run_id=run_id, type=event_type, data=data)
+    session.add(event)
+    await session.flush()
+
+    # session.get() answers from the identity map after the first load, so a
+    # runner emitting many events only reads its snapshot row once
+    snapshot = await session.get(DBRunSnapshot, run_id)
+    if snapshot is None:
+        snapshot = DBRunSnapshot(run_id=run_id, version=0, data=empty_snapshot())
+        session.add(snapshot)
+
+    snapshot.data = apply_event(snapshot.data, event_type, data)
+    snapshot.version = event.id
+    return event
+
+
+async def rebuild_snapshot(session: AsyncSession, run_id: str) -> tuple[int, dict]:
+    """Rebuild a snapshot by replaying the event log (for runs that predate snapshots)."""
+    result = await session.execute(
+        select(DBEvent.id, DBEvent.type, DBEvent.data)
+        .where(DBEvent.run_id == run_id)
+        .order_by(DBEvent.id)
+    )
+    version, data = 0, empty_snapshot()
+    for event_id, event_type, event_data in result:
+        version, data = event_id, apply_event(data, event_type, event_data)
+    return version, data
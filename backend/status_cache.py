@@ -0,0 +1,62 @@
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+
+# Run columns needed to answer a status request (no problem/state_data blobs)
+STATUS_FIELDS = (
+    "run_id",
+    "status",
+    "current_step_index",
+    "total_steps",
+    "started_at",
+    "updated_at",
+    "final_output",
+    "error",
+)
+
+MAX_CACHED_RUNS = 10000
+
+
+class StatusCache:
+    """In-memory cache of run status rows, updated by the runner.
+
+    Lets status polls skip the database and lets long-polling requests wait
+    for the next change of a run. The cache is per process, so it only sees
+    updates made by runners in the same process; readers fall back to the
+    database on a miss.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_RUNS):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._changed: dict[str, asyncio.Event] = {}
+
+    def get(self, run_id: str) -> Optional[dict]:
+        """Return the cached status fields of a run, if any."""
+        entry = self._entries.get(run_id)
+        if entry is not None:
+            self._entries.move_to_end(run_id)
+        return entry
+
+    def put(self, run_id: str, fields: dict):
+        """Store the status fields of a run and wake up anyone waiting on it."""
+        self._entries[run_id] = {name: fields[name] for name in STATUS_FIELDS}
+        self._entries.move_to_end(run_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        changed = self._changed.pop(run_id, None)
+        if changed:
+            changed.set()
+
+    async def wait_for_update(self, run_id: str, timeout: float) -> bool:
+        """Wait until the run's entry is next updated; False on timeout."""
+        changed = self._changed.setdefault(run_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+status_cache = StatusCache()
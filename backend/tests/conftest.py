@@ -0,0 +1,109 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+
+import pytest
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Must be set before database.py is imported
+os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(), "runs.db")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+
+class FakeModel:
+    """Stands in for ChatAnthropic: answers every call after a fixed delay.
+
+    Planning calls get a plan of `steps` steps, verification calls "PASS"
+    (or FAIL for the step numbers in `failing_steps`) and everything else a
+    short text. The number of messages of every call
+    is recorded in `calls` and its last prompt in `prompts`.
+    """
+
+    def __init__(self, steps: int = 3, delay: float = 0.0):
+        self.steps = steps
+        self.delay = delay
+        self.calls: list[int] = []
+        self.prompts: list[str] = []
+        self.failing_steps: set[int] = set()
+
+    def plan(self) -> str:
+        return json.dumps([
+            {
+                "step_number": i + 1,
+                "description": f"Step {i + 1}",
+                "verification_checklist": ["Done"]
+            }
+            for i in range(self.steps)
+        ])
+
+    def verdicts(self) -> str:
+        return json.dumps([
+            {
+                "step_number": i + 1,
+                "passed": i + 1 not in self.failing_steps,
+                "reason": "Incomplete" if i + 1 in self.failing_steps else ""
+            }
+            for i in range(self.steps)
+        ])
+
+    def answer(self, messages) -> str:
+        prompt = messages[-1].content
+        if "Break down the following problem" in prompt:
+            return self.plan()
+        if prompt.startswith("Verify if each"):
+            return self.verdicts()
+        if prompt.startswith("Verify"):
+            step_number = int(prompt.split("Step: Step ", 1)[1].split("\n", 1)[0])
+            return "FAIL Incomplete" if step_number in self.failing_steps else "PASS"
+        return "Output"
+
+    async def ainvoke(self, messages):
+        self.calls.append(len(messages))
+        self.prompts.append(messages[-1].content)
+        await asyncio.sleep(self.delay)
+        return AIMessage(content=self.answer(messages))
+
+    async def astream(self, messages):
+        self.calls.append(len(messages))
+        self.prompts.append(messages[-1].content)
+        await asyncio.sleep(self.delay)
+        text = self.answer(messages)
+        for start in range(0, len(text), 40):
+            yield AIMessageChunk(content=text[start:start + 40])
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Make every StepChainRunner use one FakeModel; configure it via its attributes."""
+    import runner
+
+    model = FakeModel()
+    monkeypatch.setattr(runner, "ChatAnthropic", lambda **kwargs: model)
+    return model
+
+
+@pytest.fixture
+def run_async():
+    """Run a coroutine on a fresh event loop, releasing loop-bound state afterwards."""
+    import server
+    from database import init_db, engine
+
+    async def run(coro):
+        await init_db()
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    def run_on_new_loop(coro):
+        # The runner import task belongs to the loop that created it
+        server.runner_import = None
+        return asyncio.run(run(coro))
+
+    return run_on_new_loop
@@ -0,0 +1,47 @@
+import json
+import uuid
+
+import httpx
+
+import server
+from database import async_session_maker, Run, Batch
+
+
+async def create_batch(statuses: list[str]) -> str:
+    batch_id = str(uuid.uuid4())
+    async with async_session_maker() as session:
+        session.add(Batch(batch_id=batch_id, total_runs=len(statuses)))
+        session.add_all(
+            Run(run_id=str(uuid.uuid4()), problem="Problem", status=status, batch_id=batch_id)
+            for status in statuses
+        )
+        await session.commit()
+    return batch_id
+
+
+async def stream_results(statuses: list[str]) -> list[dict]:
+    """Create a batch with runs in the given statuses and read its results stream."""
+    batch_id = await create_batch(statuses)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+        response = await client.get(f"/api/batches/{batch_id}/results")
+        return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_results_stream_closes_when_all_runs_finished(run_async):
+    lines = run_async(stream_results(["completed", "failed", "cancelled"]))
+
+    assert sorted(line["status"] for line in lines) == ["cancelled", "completed", "failed"]
+    assert len({line["run_id"] for line in lines}) == 3
+
+
+def test_results_stream_times_out_on_stalled_batch(run_async, monkeypatch):
+    monkeypatch.setattr(server, "BATCH_RESULTS_IDLE_TIMEOUT", 1)
+
+    # A run left "running" by a restart never finishes
+    lines = run_async(stream_results(["completed", "running"]))
+
+    assert len(lines) == 2
+    assert lines[0]["status"] == "completed"
+    assert "error" in lines[1]
+    assert lines[1]["progress"]["running"] == 1
+
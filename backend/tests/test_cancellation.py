@@ -0,0 +1,184 @@
+import time
+import uuid
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+import server
+from database import async_session_maker, Run, Batch, Event as DBEvent
+from models import RunOptions
+from status_cache import status_cache, STATUS_FIELDS
+
+# Per model call; a run takes several seconds if it is not cancelled
+MODEL_DELAY = 0.5
+
+
+def api_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test")
+
+
+async def create_runs(count: int, batch_id: str | None = None) -> list[str]:
+    """Insert queued runs, as the create endpoints do."""
+    run_ids = [str(uuid.uuid4()) for _ in range(count)]
+    async with async_session_maker() as session:
+        if batch_id:
+            session.add(Batch(batch_id=batch_id, total_runs=count))
+        runs = [Run(run_id=run_id, problem="Problem", status="queued", batch_id=batch_id) for run_id in run_ids]
+        session.add_all(runs)
+        await session.commit()
+        for run in runs:
+            status_cache.put(run.run_id, {name: getattr(run, name) for name in STATUS_FIELDS})
+    return run_ids
+
+
+async def wait_for_status(client: httpx.AsyncClient, run_id: str, status: str, timeout: float = 5) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        body = (await client.get(f"/api/runs/{run_id}")).json()
+        if body["status"] == status:
+            return body
+        assert time.monotonic() < deadline, f"run stayed {body['status']}, expected {status}"
+        await asyncio.sleep(0.01)
+
+
+async def event_types(run_id: str) -> list[str]:
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(DBEvent.type).where(DBEvent.run_id == run_id).order_by(DBEvent.id)
+        )
+        return list(result.scalars())
+
+
+@pytest.fixture
+def slow_model(fake_model):
+    fake_model.steps = 5
+    fake_model.delay = MODEL_DELAY
+    return fake_model
+
+
+def test_delete_cancels_in_flight_model_call(slow_model, run_async):
+    async def scenario():
+        async with api_client() as client:
+            [run_id] = await create_runs(1)
+            task = asyncio.create_task(server.run_chain(run_id, "Problem", RunOptions()))
+            await wait_for_status(client, run_id, "running")
+
+            start = time.monotonic()
+            response = await client.delete(f"/api/runs/{run_id}")
+            latency = time.monotonic() - start
+
+            assert response.status_code == 200
+            assert response.json()["status"] == "cancelled"
+            # Well under one model call: the in-flight call was cancelled, not awaited
+            assert latency < MODEL_DELAY / 2
+            await asyncio.wait_for(task, 1)
+            assert run_id not in server.background_tasks
+
+            snapshot = (await client.get(f"/api/runs/{run_id}/snapshot")).json()
+            assert snapshot["status"] == "cancelled"
+            assert "run_cancelled" in await event_types(run_id)
+
+            # Cancelling again is a conflict
+            assert (await client.delete(f"/api/runs/{run_id}")).status_code == 409
+
+    run_async(scenario())
+
+
+def test_deadline_stops_run(slow_model, run_async):
+    async def scenario():
+        async with api_client() as client:
+            [run_id] = await create_runs(1)
+
+            start = time.monotonic()
+            await server.run_chain(run_id, "Problem", RunOptions(deadline_seconds=MODEL_DELAY * 1.5))
+            assert time.monotonic() - start < MODEL_DELAY * 2.5
+
+            status = await wait_for_status(client, run_id, "cancelled", timeout=0)
+            assert "Deadline" in status["error"]
+            assert "run_cancelled" in await event_types(run_id)
+
+    run_async(scenario())
+
+
+def test_cancel_frees_batch_worker_slot(slow_model, run_async, monkeypatch):
+    monkeypatch.setattr(server, "BATCH_MAX_CONCURRENCY", 1)
+
+    async def scenario():
+        async with api_client() as client:
+            batch_id = str(uuid.uuid4())
+            first, second = await create_runs(2, batch_id)
+            batch = asyncio.create_task(server.run_batch(batch_id, [(first, "Problem"), (second, "Problem")], RunOptions()))
+            await wait_for_status(client, first, "running")
+            assert (await client.get(f"/api/runs/{second}")).json()["status"] == "queued"
+
+            await client.delete(f"/api/runs/{first}")
+            # The only worker moves on to the next run right away
+            await wait_for_status(client, second, "running", timeout=MODEL_DELAY)
+
+            await client.delete(f"/api/runs/{second}")
+            await asyncio.wait_for(batch, 1)
+
+    run_async(scenario())
+
+
+def test_cancelled_batch_does_not_leave_runs_running(slow_model, run_async, monkeypatch):
+    monkeypatch.setattr(server, "BATCH_MAX_CONCURRENCY", 1)
+
+    async def scenario():
+        async with api_client() as client:
+            batch_id = str(uuid.uuid4())
+            first, second = await create_runs(2, batch_id)
+            batch = asyncio.create_task(server.run_batch(batch_id, [(first, "Problem"), (second, "Problem")], RunOptions()))
+            await wait_for_status(client, first, "running")
+
+            batch.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await batch
+
+            assert (await client.get(f"/api/runs/{first}")).json()["status"] == "cancelled"
+            # The worker stopped instead of starting the next run
+            await asyncio.sleep(MODEL_DELAY)
+            assert (await client.get(f"/api/runs/{second}")).json()["status"] == "queued"
+
+    run_async(scenario())
+
+
+def test_cancel_while_batch_worker_starts_run(slow_model, run_async, monkeypatch):
+    mark_run_cancelled = server.mark_run_cancelled
+    workers = []
+
+    async def mark_while_worker_starts(run_id, reason):
+        if not workers:
+            # The batch worker picks the queued run up while DELETE is marking it
+            workers.append(asyncio.create_task(server.run_chain(run_id, "Problem", RunOptions())))
+            await asyncio.sleep(MODEL_DELAY / 5)
+        return await mark_run_cancelled(run_id, reason)
+
+    monkeypatch.setattr(server, "mark_run_cancelled", mark_while_worker_starts)
+
+    async def scenario():
+        async with api_client() as client:
+            [run_id] = await create_runs(1)
+            response = await client.delete(f"/api/runs/{run_id}")
+            assert response.json()["status"] == "cancelled"
+
+            await asyncio.wait_for(workers[0], 1)
+            assert (await client.get(f"/api/runs/{run_id}")).json()["status"] == "cancelled"
+            assert "run_completed" not in await event_types(run_id)
+
+    run_async(scenario())
+
+
+def test_run_cancelled_while_queued_is_not_started(slow_model, run_async):
+    async def scenario():
+        async with api_client() as client:
+            [run_id] = await create_runs(1)
+            await client.delete(f"/api/runs/{run_id}")
+
+            await server.run_chain(run_id, "Problem", RunOptions())
+            assert (await client.get(f"/api/runs/{run_id}")).json()["status"] == "cancelled"
+            assert slow_model.calls == []
+
+    run_async(scenario())
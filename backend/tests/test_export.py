@@ -0,0 +1,58 @@
+import os
+import csv
+import gzip
+import uuid
+import functools
+
+import pytest
+
+import export
+from database import async_session_maker, DATABASE_PATH, Run
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_resume_after_interrupted_export(run_async, tmp_path, monkeypatch):
+    async def create_runs():
+        async with async_session_maker() as session:
+            session.add_all(Run(run_id=str(uuid.uuid4()), problem="Problem", status="completed") for _ in range(5))
+            await session.commit()
+
+    run_async(create_runs())
+    conn = export.connect_readonly()
+    expected = [row["run_id"] for rows in export.iter_chunks(conn, "runs") for row in rows]
+    conn.close()
+
+    # One row per chunk and two rows per part file
+    monkeypatch.setattr(export, "iter_chunks", functools.partial(export.iter_chunks, chunk_size=1))
+    monkeypatch.setattr(export, "EXPORT_PART_ROWS", 2)
+
+    # Kill the export in the middle of the second part file
+    write = export.CSVWriter.write
+    written, killed_writers = [], []
+
+    def interrupted_write(self, rows):
+        if len(written) == 3:
+            # Keep the writer alive: a killed process never closes its file
+            killed_writers.append(self)
+            raise Interrupted
+        written.append(rows)
+        write(self, rows)
+
+    monkeypatch.setattr(export.CSVWriter, "write", interrupted_write)
+    with pytest.raises(Interrupted):
+        export.export_to_directory(str(tmp_path), output_format="csv", database_path=DATABASE_PATH)
+
+    monkeypatch.setattr(export.CSVWriter, "write", write)
+    export.export_to_directory(str(tmp_path), output_format="csv", resume=True, database_path=DATABASE_PATH)
+
+    exported = []
+    for name in sorted(os.listdir(tmp_path)):
+        if name.startswith("runs-"):
+            # Raises EOFError for a part file that was never closed
+            with gzip.open(tmp_path / name, "rt", newline="") as f:
+                exported += [row["run_id"] for row in csv.DictReader(f)]
+
+    assert sorted(exported) == sorted(expected)
@@ -0,0 +1,123 @@
+import time
+import asyncio
+from collections import deque
+
+import pytest
+
+from hedging import HedgePolicy
+
+HEDGE_AFTER = 0.05
+SLOW = 1.0
+
+
+def policy(**kwargs) -> HedgePolicy:
+    """An enabled policy that hedges "node" calls after HEDGE_AFTER seconds."""
+    hedge_policy = HedgePolicy(**{"enabled": True, "max_rate": 1.0, "min_samples": 5, **kwargs})
+    hedge_policy.latencies["node"] = deque([HEDGE_AFTER] * 10)
+    return hedge_policy
+
+
+class Calls:
+    """make_call() factory: the n-th call sleeps delays[n] and returns (or raises) results[n]."""
+
+    def __init__(self, *behaviours):
+        self.behaviours = list(behaviours)
+        self.started = 0
+        self.cancelled: list[int] = []
+
+    def __call__(self):
+        number = self.started
+        self.started += 1
+        return self.run(number, *self.behaviours[number])
+
+    async def run(self, number, delay, result):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(number)
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_no_hedge_before_enough_samples():
+    hedge_policy = HedgePolicy(enabled=True, max_rate=1.0, min_samples=5)
+    calls = Calls((0.2, "primary"))
+
+    assert asyncio.run(hedge_policy.call("node", calls)) == "primary"
+    assert calls.started == 1
+    assert hedge_policy.hedges == 0
+
+
+def test_hedge_fires_after_delay_and_wins():
+    hedge_policy = policy()
+    calls = Calls((SLOW, "primary"), (0, "hedge"))
+
+    start = time.monotonic()
+    assert asyncio.run(hedge_policy.call("node", calls)) == "hedge"
+    elapsed = time.monotonic() - start
+
+    assert HEDGE_AFTER <= elapsed < SLOW / 2
+    assert calls.started == 2
+    # The slow primary call lost and was cancelled
+    assert calls.cancelled == [0]
+    assert (hedge_policy.hedges, hedge_policy.hedge_wins) == (1, 1)
+
+
+def test_primary_wins_and_hedge_is_cancelled():
+    hedge_policy = policy()
+    calls = Calls((HEDGE_AFTER * 2, "primary"), (SLOW, "hedge"))
+
+    assert asyncio.run(hedge_policy.call("node", calls)) == "primary"
+    assert calls.cancelled == [1]
+    assert (hedge_policy.hedges, hedge_policy.hedge_wins) == (1, 0)
+
+
+def test_falls_back_when_first_finished_call_fails():
+    hedge_policy = policy()
+    calls = Calls((HEDGE_AFTER * 4, "primary"), (0, RuntimeError("overloaded")))
+
+    assert asyncio.run(hedge_policy.call("node", calls)) == "primary"
+    assert calls.cancelled == []
+    assert (hedge_policy.hedges, hedge_policy.hedge_wins) == (1, 0)
+
+
+def test_raises_when_both_calls_fail():
+    hedge_policy = policy()
+    calls = Calls((HEDGE_AFTER * 2, RuntimeError("primary")), (HEDGE_AFTER * 2, RuntimeError("hedge")))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(hedge_policy.call("node", calls))
+    assert (hedge_policy.hedges, hedge_policy.hedge_wins) == (1, 0)
+
+
+def test_budget_caps_concurrent_hedges():
+    hedge_policy = policy(max_rate=0.25)
+    calls = Calls(*[(HEDGE_AFTER * 4, "result")] * 16)
+
+    async def burst():
+        return await asyncio.gather(*(hedge_policy.call("node", calls) for _ in range(8)))
+
+    assert asyncio.run(burst()) == ["result"] * 8
+    # 25% of 8 calls, counting hedges that are still in flight
+    assert hedge_policy.hedges == 2
+    assert calls.started == 10
+
+
+def test_budget_only_counts_recent_calls():
+    hedge_policy = policy(max_rate=0.1, budget_window=10)
+
+    async def quiet_then_spike():
+        # A long quiet period of fast, unhedged calls
+        hedge_policy.enabled = False
+        for _ in range(100):
+            await hedge_policy.call("node", Calls((0, "fast")))
+        hedge_policy.enabled = True
+        # A latency spike: every call is slow
+        calls = Calls(*[(HEDGE_AFTER * 4, "slow")] * 20)
+        await asyncio.gather(*(hedge_policy.call("node", calls) for _ in range(10)))
+
+    asyncio.run(quiet_then_spike())
+    # A lifetime budget would allow 11 hedges (10% of 110 calls)
+    assert hedge_policy.hedges == 1
@@ -0,0 +1,89 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from database import async_session_maker, Run, Event as DBEvent
+from json_stream import JSONArrayStreamParser
+from runner import StepChainRunner
+
+PLAN = [
+    {"step_number": 1, "description": "First", "verification_checklist": ["Done"]},
+    {"step_number": 2, "description": "Second [with] {braces}", "verification_checklist": ["Done"]},
+]
+PLAN_JSON = json.dumps(PLAN, indent=2)
+
+
+def parse(text: str, chunk_size: int) -> tuple[JSONArrayStreamParser, list]:
+    parser = JSONArrayStreamParser()
+    streamed = []
+    for start in range(0, len(text), chunk_size):
+        streamed += parser.feed(text[start:start + chunk_size])
+    return parser, streamed
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 10_000])
+@pytest.mark.parametrize("text, restarts", [
+    (PLAN_JSON, 0),
+    (f"Here is the plan:\n```json\n{PLAN_JSON}\n```\nGood luck!", 0),
+    (f"Steps [see below]:\n```\n{PLAN_JSON}\n```", 0),
+    # A fenced block takes precedence over an array in the prose before it
+    (f'Note: like [{{"k": "v"}}] ...\n```json\n{PLAN_JSON}\n```', 1),
+    # Bracketed placeholders that are not JSON are skipped
+    (f"Format: [{{...}}]\n```json\n{PLAN_JSON}\n```", 0),
+    (f"Return steps like [{{step}}]:\n```json\n{PLAN_JSON}\n```", 0),
+    (f'Unlike [{{"k": "v"}}, 2]:\n{PLAN_JSON}', 1),
+    # A fenced block without an array of objects falls back to the earlier array
+    (f"Plan: {PLAN_JSON}\n```python\nsteps = [1, 2]\n```\nDone", 1),
+])
+def test_parser_extracts_plan(text, restarts, chunk_size):
+    parser, streamed = parse(text, chunk_size)
+
+    assert parser.done
+    assert parser.objects == PLAN
+    assert parser.restarts == restarts
+    if not restarts:
+        assert streamed == PLAN
+
+
+def test_parser_ignores_backticks_inside_strings():
+    plan = [{"description": "Run `make` then ```test```"}]
+    parser, _ = parse(f"```json\n{json.dumps(plan)}\n```", 5)
+
+    assert parser.objects == plan
+
+
+def test_parser_reports_incomplete_array():
+    parser, streamed = parse(PLAN_JSON[:-5], 3)
+
+    assert not parser.done
+    assert streamed == PLAN[:1]
+
+
+@pytest.mark.parametrize("prose", ['Note: like [{"k": "v"}] ...', "Format: [{...}]", "Return steps like [{step}]:"])
+def test_extract_json_prefers_fenced_block(prose):
+    text = f"{prose}\n```json\n{PLAN_JSON}\n```"
+
+    assert StepChainRunner.extract_json_from_response(None, text) == PLAN
+
+
+def test_streamed_plan_prefers_fenced_block(fake_model, run_async, monkeypatch):
+    # Step 1 is prefetched from the prose array before the fence opens
+    plan = fake_model.plan()
+    monkeypatch.setattr(fake_model, "plan", lambda: f'Unlike [{{"description": "Not a step"}}]:\n```json\n{plan}\n```')
+
+    async def scenario():
+        run_id = str(uuid.uuid4())
+        async with async_session_maker() as session:
+            session.add(Run(run_id=run_id, problem="Problem", status="queued"))
+            await session.commit()
+            await StepChainRunner(session).run(run_id, "Problem")
+            result = await session.execute(
+                select(DBEvent.data).where(DBEvent.run_id == run_id).where(DBEvent.type == "plan_created")
+            )
+            return result.scalar_one()["plan"]
+
+    assert run_async(scenario()) == json.loads(plan)
+    # The prefetched call was discarded and step 1 executed from the fenced plan
+    assert any("Current Step: Step 1" in prompt for prompt in fake_model.prompts)
@@ -0,0 +1,65 @@
+import uuid
+from collections import deque
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+import runner
+from database import async_session_maker, Run
+from runner import StepChainRunner, append_messages, MAX_MESSAGES_IN_CONTEXT
+
+
+def messages(count: int) -> list[HumanMessage]:
+    return [HumanMessage(content=str(i)) for i in range(count)]
+
+
+def test_append_messages_keeps_only_recent_messages():
+    window = append_messages([], messages(3))
+    assert isinstance(window, deque)
+    assert window.maxlen == MAX_MESSAGES_IN_CONTEXT
+    assert [m.content for m in window] == ["0", "1", "2"]
+
+    window = append_messages(window, messages(MAX_MESSAGES_IN_CONTEXT + 2))
+    assert len(window) == MAX_MESSAGES_IN_CONTEXT
+    assert [m.content for m in window][-1] == str(MAX_MESSAGES_IN_CONTEXT + 1)
+
+
+def test_append_messages_updates_window_in_place():
+    window = append_messages(None, messages(1))
+    assert append_messages(window, messages(1)) is window
+    # Nothing to append leaves the window as is
+    assert list(append_messages(window, [])) == list(window)
+
+
+@pytest.mark.parametrize("steps", [3, 10, 40])
+def test_message_window_stays_flat_as_steps_grow(steps, fake_model, run_async, monkeypatch):
+    fake_model.steps = steps
+    monkeypatch.setattr(runner, "GRAPH_RECURSION_LIMIT", 4 * steps + 10)
+
+    # Record the size of the message history every node is called with
+    window_sizes = []
+    labelled = StepChainRunner.labelled
+
+    def recording_labelled(self, name, node):
+        async def record(state):
+            window_sizes.append(len(state["messages"]))
+            return await node(state)
+        return labelled(self, name, record)
+
+    monkeypatch.setattr(StepChainRunner, "labelled", recording_labelled)
+
+    async def scenario():
+        run_id = str(uuid.uuid4())
+        async with async_session_maker() as session:
+            session.add(Run(run_id=run_id, problem="Problem", status="queued"))
+            await session.commit()
+            await StepChainRunner(session).run(run_id, "Problem")
+            return (await session.get(Run, run_id)).status
+
+    assert run_async(scenario()) == "completed"
+
+    # create_plan + execute and verify per step + generate_final
+    assert len(window_sizes) == 2 * steps + 2
+    assert max(window_sizes) <= MAX_MESSAGES_IN_CONTEXT
+    # The history plus the node's own prompt
+    assert max(fake_model.calls) <= MAX_MESSAGES_IN_CONTEXT + 1
@@ -0,0 +1,57 @@
+import json
+import uuid
+import asyncio
+
+from sqlalchemy import select, func
+
+import plan_index
+import server
+from database import async_session_maker, Run
+from plan_index import PlanIndex
+
+PLAN = [{"step_number": 1, "description": "Add the numbers", "verification_checklist": ["Sum is right"]}]
+
+
+def test_startup_does_not_wait_for_plan_index_backfill(run_async, tmp_path, monkeypatch):
+    index = PlanIndex(str(tmp_path / "plan_index.jsonl"))
+    monkeypatch.setattr(plan_index, "plan_index", index)
+    monkeypatch.setattr(server, "PLAN_REUSE", "direct")
+    monkeypatch.setenv("RUNNER_WARMUP", "false")
+
+    async def scenario():
+        async with async_session_maker() as session:
+            session.add_all(
+                Run(
+                    run_id=str(uuid.uuid4()),
+                    problem=f"Add the numbers {i} and {i + 1} together",
+                    status="completed",
+                    state_data=json.dumps({"plan": PLAN})
+                )
+                for i in range(200)
+            )
+            await session.commit()
+            # Including completed runs of other tests
+            expected = await session.scalar(
+                select(func.count()).select_from(Run)
+                .where(Run.status == "completed")
+                .where(Run.state_data.is_not(None))
+            )
+
+        async with server.lifespan(server.app):
+            # Started up before any run was indexed
+            assert len(index) == 0
+            for _ in range(500):
+                if len(index) == expected:
+                    break
+                await asyncio.sleep(0.01)
+
+        assert len(index) == expected
+        assert index.find("Add the numbers 7 and 8 together", threshold=0.5).plan == PLAN
+        return expected
+
+    expected = run_async(scenario())
+
+    # The index file holds every entry once and reloads to the same index
+    reloaded = PlanIndex(index.path)
+    reloaded.load()
+    assert len(reloaded) == expected
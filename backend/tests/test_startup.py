@@ -0,0 +1,63 @@
+import time
+import uuid
+import asyncio
+import importlib
+
+import server
+from database import async_session_maker, Run
+from models import RunOptions
+
+IMPORT_DELAY = 0.5
+
+
+async def create_run() -> str:
+    run_id = str(uuid.uuid4())
+    async with async_session_maker() as session:
+        session.add(Run(run_id=run_id, problem="Problem", status="queued"))
+        await session.commit()
+    return run_id
+
+
+async def run_status(run_id: str) -> str:
+    async with async_session_maker() as session:
+        return (await session.get(Run, run_id)).status
+
+
+def test_run_cancelled_during_warmup_does_not_cancel_import(fake_model, run_async, monkeypatch):
+    import_module = importlib.import_module
+
+    def slow_import(name, *args):
+        if name == "runner":
+            time.sleep(IMPORT_DELAY)
+        return import_module(name, *args)
+
+    monkeypatch.setattr(importlib, "import_module", slow_import)
+
+    async def scenario():
+        # The warm-up import is still running when the first run hits its deadline
+        server.load_runner()
+        first = await create_run()
+        await server.run_chain(first, "Problem", RunOptions(deadline_seconds=IMPORT_DELAY / 4))
+        assert await run_status(first) == "cancelled"
+        assert not server.runner_import.cancelled()
+
+        second = await create_run()
+        await server.run_chain(second, "Problem", RunOptions())
+        assert await run_status(second) == "completed"
+        assert server.runner_ready()
+
+    run_async(scenario())
+
+
+def test_cancelled_import_is_started_again(run_async):
+    async def scenario():
+        cancelled = server.load_runner()
+        cancelled.cancel()
+        await asyncio.wait({cancelled})
+
+        assert not server.runner_ready()
+        assert server.load_runner() is not cancelled
+        await server.load_runner()
+        assert server.runner_ready()
+
+    run_async(scenario())
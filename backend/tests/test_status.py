@@ -0,0 +1,146 @@
+import time
+import uuid
+import asyncio
+from datetime import datetime
+
+import httpx
+
+import server
+from database import async_session_maker, engine, Run
+from status_cache import status_cache, STATUS_FIELDS
+
+
+def api_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test")
+
+
+async def create_run(cached: bool = True) -> str:
+    run_id = str(uuid.uuid4())
+    async with async_session_maker() as session:
+        run = Run(run_id=run_id, problem="Problem", status="queued")
+        session.add(run)
+        await session.commit()
+        if cached:
+            status_cache.put(run_id, {name: getattr(run, name) for name in STATUS_FIELDS})
+    return run_id
+
+
+async def advance(run_id: str, **changes):
+    """Update a run as the runner does: database first, then the cache."""
+    async with async_session_maker() as session:
+        run = await session.get(Run, run_id)
+        for key, value in {**changes, "updated_at": datetime.utcnow()}.items():
+            setattr(run, key, value)
+        await session.commit()
+        status_cache.put(run_id, {name: getattr(run, name) for name in STATUS_FIELDS})
+
+
+def test_etag_returns_304_until_run_changes(run_async):
+    async def scenario():
+        async with api_client() as client:
+            run_id = await create_run()
+            response = await client.get(f"/api/runs/{run_id}")
+            etag = response.headers["etag"]
+
+            response = await client.get(f"/api/runs/{run_id}", headers={"If-None-Match": etag})
+            assert response.status_code == 304
+            assert response.headers["etag"] == etag
+
+            await advance(run_id, status="running")
+            response = await client.get(f"/api/runs/{run_id}", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.json()["status"] == "running"
+            assert response.headers["etag"] != etag
+
+    run_async(scenario())
+
+
+def test_wait_returns_on_change(run_async):
+    async def scenario():
+        async with api_client() as client:
+            run_id = await create_run()
+            etag = (await client.get(f"/api/runs/{run_id}")).headers["etag"]
+
+            start = time.monotonic()
+            poll = asyncio.create_task(
+                client.get(f"/api/runs/{run_id}", params={"wait": 5}, headers={"If-None-Match": etag})
+            )
+            await asyncio.sleep(0.2)
+            assert not poll.done()
+            await advance(run_id, status="running")
+
+            response = await poll
+            assert time.monotonic() - start < 1
+            assert response.status_code == 200
+            assert response.json()["status"] == "running"
+
+    run_async(scenario())
+
+
+def test_wait_times_out_with_304(run_async):
+    async def scenario():
+        async with api_client() as client:
+            run_id = await create_run()
+            etag = (await client.get(f"/api/runs/{run_id}")).headers["etag"]
+
+            start = time.monotonic()
+            response = await client.get(f"/api/runs/{run_id}", params={"wait": 0.5}, headers={"If-None-Match": etag})
+            assert time.monotonic() - start >= 0.5
+            assert response.status_code == 304
+
+    run_async(scenario())
+
+
+def test_wait_with_stale_etag_returns_immediately(run_async):
+    async def scenario():
+        async with api_client() as client:
+            run_id = await create_run()
+            etag = (await client.get(f"/api/runs/{run_id}")).headers["etag"]
+            await advance(run_id, status="running")
+
+            start = time.monotonic()
+            response = await client.get(f"/api/runs/{run_id}", params={"wait": 5}, headers={"If-None-Match": etag})
+            assert time.monotonic() - start < 0.5
+            assert response.json()["status"] == "running"
+
+    run_async(scenario())
+
+
+def test_long_poll_does_not_hold_a_connection(run_async):
+    async def scenario():
+        async with api_client() as client:
+            # Not cached (e.g. after a restart), so the status is read from the database
+            run_id = await create_run(cached=False)
+            polls = [
+                asyncio.create_task(client.get(f"/api/runs/{run_id}", params={"wait": 5}))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0.2)
+            assert engine.pool.checkedout() == 0
+
+            await advance(run_id, status="running")
+            for response in await asyncio.gather(*polls):
+                assert response.json()["status"] == "running"
+
+    run_async(scenario())
+
+
+def test_cache_miss_keeps_newer_cached_status(run_async):
+    async def scenario():
+        run_id = await create_run(cached=False)
+        async with async_session_maker() as session:
+            execute = session.execute
+
+            async def execute_then_advance(*args, **kwargs):
+                # The runner updates the run while the status query is running
+                result = await execute(*args, **kwargs)
+                await advance(run_id, status="running")
+                return result
+
+            session.execute = execute_then_advance
+            fields = await server.load_run_status(session, run_id)
+
+        assert fields["status"] == "running"
+        assert status_cache.get(run_id)["status"] == "running"
+
+    run_async(scenario())
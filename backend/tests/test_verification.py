@@ -0,0 +1,104 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from database import async_session_maker, Run, Event as DBEvent
+from runner import StepChainRunner
+
+
+def run_with_policy(run_async, policy: str, **options) -> tuple[list[str], list]:
+    """Run a problem with a verification policy; return its verify events and verification_results."""
+    async def scenario():
+        run_id = str(uuid.uuid4())
+        async with async_session_maker() as session:
+            session.add(Run(run_id=run_id, problem="Problem", status="queued"))
+            await session.commit()
+            await StepChainRunner(session).run(run_id, "Problem", verification_policy=policy, **options)
+
+            run = await session.get(Run, run_id)
+            assert run.status == "completed"
+            result = await session.execute(
+                select(DBEvent.type, DBEvent.data)
+                .where(DBEvent.run_id == run_id)
+                .where(DBEvent.type.in_(["verify_pass", "verify_fail"]))
+                .order_by(DBEvent.id)
+            )
+            events = [f"{event_type}:{data['step_number']}" for event_type, data in result]
+            return events, json.loads(run.state_data)["verification_results"]
+
+    return run_async(scenario())
+
+
+def verification_calls(fake_model) -> list[str]:
+    return [prompt for prompt in fake_model.prompts if prompt.startswith("Verify")]
+
+
+def test_per_step_verifies_every_step(fake_model, run_async):
+    fake_model.steps = 3
+    fake_model.failing_steps = {2}
+
+    events, results = run_with_policy(run_async, "per_step")
+
+    assert events == ["verify_pass:1", "verify_fail:2", "verify_pass:3"]
+    assert results == [True, False, True]
+    assert len(verification_calls(fake_model)) == 3
+
+
+def test_off_skips_verification(fake_model, run_async):
+    fake_model.steps = 3
+
+    events, results = run_with_policy(run_async, "off")
+
+    assert events == []
+    assert results == [None, None, None]
+    assert verification_calls(fake_model) == []
+
+
+def test_sampled_verifies_a_subset(fake_model, run_async):
+    fake_model.steps = 4
+
+    events, results = run_with_policy(run_async, "sampled", verification_sample_rate=0.5)
+
+    assert len(events) == 2
+    assert len(verification_calls(fake_model)) == 2
+    verified = [i + 1 for i, result in enumerate(results) if result is not None]
+    assert events == [f"verify_pass:{step}" for step in verified]
+    assert results.count(None) == 2
+
+
+def test_sampled_verifies_at_least_one_step(fake_model, run_async):
+    fake_model.steps = 3
+
+    events, results = run_with_policy(run_async, "sampled", verification_sample_rate=0.0)
+
+    assert len(events) == 1
+    assert results.count(None) == 2
+
+
+@pytest.mark.parametrize("step_number_type", [int, str])
+def test_batched_verifies_all_steps_in_one_call(step_number_type, fake_model, run_async, monkeypatch):
+    fake_model.steps = 3
+    fake_model.failing_steps = {2}
+    verdicts = fake_model.verdicts
+    monkeypatch.setattr(fake_model, "verdicts", lambda: json.dumps([
+        {**verdict, "step_number": step_number_type(verdict["step_number"])}
+        for verdict in json.loads(verdicts())
+    ]))
+
+    events, results = run_with_policy(run_async, "batched")
+
+    assert len(verification_calls(fake_model)) == 1
+    assert events == ["verify_pass:1", "verify_fail:2", "verify_pass:3"]
+    assert results == [True, False, True]
+
+
+def test_batched_passes_steps_when_response_is_not_json(fake_model, run_async, monkeypatch):
+    fake_model.steps = 2
+    monkeypatch.setattr(fake_model, "verdicts", lambda: "All steps look fine")
+
+    events, results = run_with_policy(run_async, "batched")
+
+    assert events == ["verify_pass:1", "verify_pass:2"]
+    assert results == [True, True]
@@ -76,6 +76,8 @@ export default function Home() {
         return 'Run completed successfully!'
       case 'run_failed':
         return `Run failed: ${data.error?.substring(0, 100) || 'Unknown error'}`
+      case 'run_cancelled':
+        return `Run cancelled: ${data.error?.substring(0, 100) || 'Cancelled'}`
       default:
         return JSON.stringify(data).substring(0, 100)
     }
@@ -90,6 +92,7 @@ export default function Home() {
       case 'verify_fail': return '❌'
       case 'run_completed': return '🎉'
       case 'run_failed': return '⚠️'
+      case 'run_cancelled': return '⏹️'
       default: return '📌'
     }
   }
@@ -196,12 +199,19 @@ export default function Home() {
             setLoading(false)
             eventSource.close()
             break
+            
+          case 'run_cancelled':
+            setStatus('cancelled')
+            setError(eventData.data.error)
+            setLoading(false)
+            eventSource.close()
+            break
         }
       }
 
       eventSource.onerror = () => {
         eventSource.close()
-        if (status !== 'completed' && status !== 'failed') {
+        if (status !== 'completed' && status !== 'failed' && status !== 'cancelled') {
           setLoading(false)
         }
       }
@@ -296,7 +306,7 @@ export default function Home() {
             <div className="flex items-center justify-between mt-2">
               <span className={`text-xs font-medium px-2 py-1 rounded ${
                 status === 'completed' ? 'bg-green-900 text-green-300' :
-                status === 'failed' ? 'bg-red-900 text-red-300' :
+                status === 'failed' || status === 'cancelled' ? 'bg-red-900 text-red-300' :
                 status === 'running' ? 'bg-blue-900 text-blue-300' :
                 'bg-gray-700 text-gray-300'
               }`}>